@@ -1,114 +1,130 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Request, Response
+from starlette.concurrency import run_in_threadpool
 import logging
 
-# DI dependencies
-from .dependencies import get_savee_driver, get_cosmos_driver
 # assuming schemas.py and models.py are in the same package
 from . import schemas
 from like_scanner.core import models
 # Import the functions and classes for authentication and parsing
 # adjust the import to the actual module
-from like_scanner.infra.drivers.savee_driver import perform_savee_login
-from like_scanner.infra.drivers.cosmos_driver import perform_cosmos_login
+from like_scanner.infra.drivers.savee_driver import init_driver, perform_savee_login
+from like_scanner.infra.drivers.cosmos_driver import init_cosmos_driver, perform_cosmos_login
 
-# Configure logger for this module
+# Logger for this module; records propagate to the root handlers (logging_conf)
 logger = logging.getLogger("like_scanner.routes")
-logger.setLevel(logging.INFO)
-# Ensure the logger has a handler with the desired format (▶)
-if not logger.handlers:
-    handler = logging.StreamHandler()
-    handler.setLevel(logging.INFO)
-    handler.setFormatter(logging.Formatter(
-        "%(asctime)s ▶ %(levelname)s ▶ %(message)s"))
-    logger.addHandler(handler)
 
 # Initialize API router
 router = APIRouter()
 
+# Pre-encoded /health body: no per-request dict, encoder or JSON dump
+_HEALTH_BODY = b'{"status":"ok"}'
+
+
+# attr в app.state → (фабрика драйвера, имя платформы для логов)
+_DRIVER_FACTORIES = {
+    "driver_savee": (init_driver, "Savee"),
+    "driver_cosmos": (init_cosmos_driver, "Cosmos"),
+}
+
+
+async def _state_driver(request: Request, attr: str):
+    """Достаёт Selenium-драйвер из app.state напрямую, минуя FastAPI Depends.
+    При первом обращении запускает драйвер в threadpool под asyncio.Lock
+    платформы (app.state.<attr>_lock), чтобы Chrome стартовал ровно один раз.
+    Если запустить драйвер не удалось, вызывает HTTP 500.
+    """
+    state = request.app.state
+    driver = getattr(state, attr, None)
+    if driver is not None:
+        return driver
+
+    factory, name = _DRIVER_FACTORIES[attr]
+    async with getattr(state, f"{attr}_lock"):
+        driver = getattr(state, attr, None)
+        if driver is None:
+            logger.info("Initializing %s driver on first use...", name)
+            try:
+                driver = await run_in_threadpool(factory)
+            except Exception as exc:
+                logger.exception("Failed to initialize %s driver: %s", name, exc)
+                raise HTTPException(500, f"{name} driver is not initialized")
+            setattr(state, attr, driver)
+            logger.info("%s driver ready.", name)
+    return driver
+
 # ── Auth Routes ──
 
 
-@router.get("/health", response_class=JSONResponse)
+@router.get("/health")
 async def health():
     """Health check endpoint."""
-    # Simply return a positive health status
-    return JSONResponse(content={"status": "ok"})
+    # Simply return a positive health status (never touches the threadpool)
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
-@router.post("/parse-savee-auth", response_class=JSONResponse)
-def parse_savee_auth(savee_driver=Depends(get_savee_driver)):
+@router.post("/parse-savee-auth")
+async def parse_savee_auth(request: Request):
     """
     Авторизация на Savee через magic-link из настроек.
     """
-    try:
-        logger.info("▶ Starting Savee authentication…")
-        if not perform_savee_login(savee_driver):
-            raise RuntimeError("Savee login failed")
-        logger.info("▶ Savee authentication successful.")
-        return JSONResponse(content={"status": "success"})
-    except Exception as exc:
-        logger.error("Savee authentication failed: %s", exc, exc_info=True)
-        raise HTTPException(500, str(exc))
-
-
-@router.post("/parse-cosmos-auth", response_class=JSONResponse)
-def parse_cosmos_auth(cosmos_driver=Depends(get_cosmos_driver)):
+    savee_driver = await _state_driver(request, "driver_savee")
+    logger.info("▶ Starting Savee authentication…")
+    if not await run_in_threadpool(perform_savee_login, savee_driver):
+        raise RuntimeError("Savee login failed")
+    logger.info("▶ Savee authentication successful.")
+    return {"status": "success"}
+
+
+@router.post("/parse-cosmos-auth")
+async def parse_cosmos_auth(request: Request):
     """
     Авторизация на Cosmos (email/пароль из .env).
     """
-    try:
-        logger.info("▶ Starting Cosmos authentication…")
-        if not perform_cosmos_login(cosmos_driver):
-            raise RuntimeError("Cosmos login failed")
-        logger.info("▶ Cosmos authentication successful.")
-        return JSONResponse(content={"status": "success"})
-    except Exception as exc:
-        logger.error("Cosmos authentication failed: %s", exc, exc_info=True)
-        raise HTTPException(500, str(exc))
+    cosmos_driver = await _state_driver(request, "driver_cosmos")
+    logger.info("▶ Starting Cosmos authentication…")
+    if not await run_in_threadpool(perform_cosmos_login, cosmos_driver):
+        raise RuntimeError("Cosmos login failed")
+    logger.info("▶ Cosmos authentication successful.")
+    return {"status": "success"}
 
 # ── Parse Routes ──
 
 
-@router.post("/parse-savee-continue", response_class=JSONResponse)
-def parse_savee_continue(
-    request: schemas.SaveeContinueRequest,
-    savee_driver=Depends(get_savee_driver),
+@router.post("/parse-savee-continue", response_model=models.ScanResult)
+async def parse_savee_continue(
+    request: Request,
+    payload: schemas.SaveeContinueRequest,
 ):
     """
     Продолжить парсинг Savee с указанного индекса.
     """
-    try:
-        logger.info("▶ Continuing Savee parsing operation…")
-        session_tracker = models.SessionTracker(
-            driver=savee_driver,
-            next_index=request.next_index,
-        )
-        scan_result: models.ScanResult = session_tracker.continue_parse()
-        return JSONResponse(content=scan_result.dict())
-    except Exception as exc:
-        logger.error("Error during Savee parse continuation: %s",
-                     exc, exc_info=True)
-        raise HTTPException(500, str(exc))
-
-
-@router.post("/parse-cosmos-continue", response_class=JSONResponse)
-def parse_cosmos_continue(
-    request: schemas.CosmosContinueRequest,
-    cosmos_driver=Depends(get_cosmos_driver),
+    savee_driver = await _state_driver(request, "driver_savee")
+    logger.info("▶ Continuing Savee parsing operation…")
+    session_tracker = models.SessionTracker(
+        driver=savee_driver,
+        next_index=payload.next_index,
+    )
+    scan_result: models.ScanResult = await run_in_threadpool(
+        session_tracker.continue_parse)
+    # Serialized by the response_model's compiled pydantic-core serializer
+    return scan_result
+
+
+@router.post("/parse-cosmos-continue", response_model=models.ScanResult)
+async def parse_cosmos_continue(
+    request: Request,
+    payload: schemas.CosmosContinueRequest,
 ):
     """
     Продолжить парсинг Cosmos с указанного индекса.
     """
-    try:
-        logger.info("▶ Continuing Cosmos parsing operation…")
-        session_tracker = models.SessionTracker(
-            driver=cosmos_driver,
-            next_index=request.next_index,
-        )
-        scan_result: models.ScanResult = session_tracker.continue_parse()
-        return JSONResponse(content=scan_result.dict())
-    except Exception as exc:
-        logger.error("Error during Cosmos parse continuation: %s",
-                     exc, exc_info=True)
-        raise HTTPException(500, str(exc))
+    cosmos_driver = await _state_driver(request, "driver_cosmos")
+    logger.info("▶ Continuing Cosmos parsing operation…")
+    session_tracker = models.SessionTracker(
+        driver=cosmos_driver,
+        next_index=payload.next_index,
+    )
+    scan_result: models.ScanResult = await run_in_threadpool(
+        session_tracker.continue_parse)
+    # Serialized by the response_model's compiled pydantic-core serializer
+    return scan_result
@@ -4,43 +4,23 @@
 - AuthRequest
 - ScanResponse
 
-Каждая модель добавляет запись в лог при создании экземпляра.
-Логгер модуля "like_scanner.schemas" настроен с уровнем INFO и форматом '▶'.
+Схемы создаются на каждый запрос, поэтому конструкторы не переопределяются
+и ничего не логируют.
 """
-import logging
 from pydantic import BaseModel, Field
 from typing import Optional
 
-# Настройка логгера для текущего модуля
-logger = logging.getLogger("like_scanner.schemas")
-if not logger.handlers:
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter("▶ %(message)s")
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-logger.setLevel(logging.INFO)
-
 
 class ParseContinueRequest(BaseModel):
     """Входная схема для продолжения парсинга (общая для Savee и Cosmos)."""
     next_index: int = Field(...,
                             description="Индекс элемента, с которого продолжить парсинг")
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        logger.info(
-            f"Инициализирован {self.__class__.__name__} с данными: {self.dict()}")
-
 
 class AuthRequest(BaseModel):
     """Входная схема для авторизации (если требуется URL профиля)."""
     profile_url: str = Field(..., description="URL профиля для авторизации")
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        logger.info(
-            f"Инициализирован {self.__class__.__name__} с данными: {self.dict()}")
-
 
 # --- Platform‑specific aliases ------------------------------------------
 class SaveeAuthRequest(AuthRequest):
@@ -75,11 +55,6 @@ class ScanResponse(BaseModel):
     error: Optional[str] = Field(
         None, description="Сообщение об ошибке (если произошла ошибка)")
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        logger.info(
-            f"Инициализирован {self.__class__.__name__} с данными: {self.dict()}")
-
 
 __all__ = [
     "ParseContinueRequest",
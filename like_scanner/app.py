@@ -1,55 +1,109 @@
-from like_scanner.api import routes
-from like_scanner.infra.drivers import savee_driver, cosmos_driver
+import asyncio
 import logging
-from fastapi import FastAPI
 
-# Import logging configuration to ensure structured log format is applied
-# This module sets up logging format/project settings
+# Import logging configuration first so that the root handlers exist before
+# any other module (config, constants, drivers) emits import-time records.
+# Modules do not install handlers of their own; records propagate to root.
 from like_scanner.infra import logging_conf
 
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from like_scanner.api import routes
+from like_scanner.config import settings
+from like_scanner.infra.drivers import cosmos_driver, savee_driver, shared_chrome
+
 # Initialize a logger for this module
 logger = logging.getLogger("like_scanner.app")
 
-# Create FastAPI application without Swagger UI or OpenAPI docs
-app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None)
-
-# Import the Selenium driver initialization functions
+# Create FastAPI application without Swagger UI or OpenAPI docs.
+# Routes return plain dicts; orjson serializes them via ORJSONResponse.
+app = FastAPI(
+    docs_url=None,
+    redoc_url=None,
+    openapi_url=None,
+    default_response_class=ORJSONResponse,
+)
 
 # Include API routes from the like_scanner.api.routes module
 app.include_router(routes.router)
 
 
+@app.exception_handler(Exception)
+async def on_unhandled_error(request: Request, exc: Exception):
+    """Single place that logs route failures and turns them into HTTP 500.
+
+    Routes do not wrap their bodies in try/except; the response keeps the
+    `{"detail": ...}` shape that HTTPException used to produce. Starlette
+    re-raises the exception after this response, so the server logs the
+    traceback; here it is a single line.
+    """
+    logger.error("%s %s failed: %s", request.method, request.url.path, exc)
+    return ORJSONResponse({"detail": str(exc)}, status_code=500)
+
+# Middleware policy: do NOT use `@app.middleware("http")` or BaseHTTPMiddleware
+# subclasses — they wrap every request in extra tasks/streams and cost
+# noticeable throughput. Write middleware as a plain ASGI class instead and
+# register it with `app.add_middleware(...)`:
+#
+#     class SomeMiddleware:
+#         def __init__(self, app):
+#             self.app = app
+#
+#         async def __call__(self, scope, receive, send):
+#             if scope["type"] != "http":
+#                 return await self.app(scope, receive, send)
+#             ...
+#             await self.app(scope, receive, send)
+
+
 @app.on_event("startup")
-def on_startup():
-    """Event handler for application startup: initialize Selenium drivers."""
+async def on_startup():
+    """Event handler for application startup: prepare lazy Selenium drivers.
+
+    By default Chrome is not launched here: each driver is created on first
+    use by the routes (see `routes._state_driver`), guarded by the
+    per-platform lock. With WARMUP_DRIVERS enabled both drivers are started
+    in parallel before the app begins serving.
+    """
+    # The log writer starts on import of logging_conf; this is a no-op then,
+    # but restarts it if a previous shutdown in this process stopped it
+    logging_conf.start_listener()
     logger.info("Starting Like-Scanner API...")
 
-    # Initialize Savee driver
-    logger.info("Initializing Savee driver...")
-    try:
-        savee = savee_driver.init_driver()  # Launch headless Savee Selenium WebDriver
-        app.state.driver_savee = savee
-        logger.info("Savee driver ready.")
-    except Exception as e:
-        logger.exception("Failed to initialize Savee driver: %s", e)
-        # If Savee driver fails to initialize, prevent startup (re-raise to halt application start)
-        raise
+    app.state.driver_savee = None
+    app.state.driver_cosmos = None
+    app.state.driver_savee_lock = asyncio.Lock()
+    app.state.driver_cosmos_lock = asyncio.Lock()
 
-    # Initialize Cosmos driver
-    logger.info("Initializing Cosmos driver...")
-    try:
-        # Launch headless Cosmos Selenium WebDriver
-        cosmos = cosmos_driver.init_cosmos_driver()
-        app.state.driver_cosmos = cosmos
-        logger.info("Cosmos driver ready.")
-    except Exception as e:
-        logger.exception("Failed to initialize Cosmos driver: %s", e)
-        # Cleanup already initialized Savee driver before halting
-        try:
-            app.state.driver_savee.quit()
-        except Exception:
-            pass
-        raise
+    if not settings.WARMUP_DRIVERS:
+        logger.info("Selenium drivers will be initialized on first use.")
+        return
+
+    logger.info("Initializing Savee and Cosmos drivers in parallel...")
+    savee, cosmos = await asyncio.gather(
+        run_in_threadpool(savee_driver.init_driver),
+        run_in_threadpool(cosmos_driver.init_cosmos_driver),
+        return_exceptions=True,
+    )
+    failed = [e for e in (savee, cosmos) if isinstance(e, BaseException)]
+    if failed:
+        for name, result in (("Savee", savee), ("Cosmos", cosmos)):
+            if isinstance(result, BaseException):
+                logger.error("Failed to initialize %s driver: %s", name, result,
+                             exc_info=result)
+            else:
+                # Cleanup the driver that did start before halting
+                try:
+                    result.quit()
+                except Exception:
+                    pass
+        raise failed[0]
+
+    app.state.driver_savee = savee
+    app.state.driver_cosmos = cosmos
+    logger.info("Savee and Cosmos drivers ready.")
 
 
 @app.on_event("shutdown")
@@ -76,3 +130,12 @@ def on_shutdown():
             logger.info("Cosmos driver closed.")
         except Exception as e:
             logger.exception("Error while closing Cosmos driver: %s", e)
+
+    # Stop the shared Chrome process (no-op unless SHARE_CHROME is enabled)
+    try:
+        shared_chrome.shutdown()
+    except Exception as e:
+        logger.exception("Error while stopping shared Chrome: %s", e)
+
+    # Flush queued log records and stop the background writer last
+    logging_conf.stop_listener()
@@ -21,6 +21,7 @@ from __future__ import annotations
 
 import logging
 import os
+import re
 from pathlib import Path
 from typing import Any, Dict
 
@@ -39,14 +40,8 @@ else:
         load_dotenv(custom_env)
 
 # ── Логгер модуля конфигурации ──────────────────────────────
+# Обработчики не ставим: записи уходят в корневой логгер (logging_conf)
 logger = logging.getLogger("like_scanner.config")
-if not logger.handlers:
-    stream = logging.StreamHandler()
-    stream.setFormatter(
-        logging.Formatter("[%(asctime)s] %(levelname)s [%(name)s] %(message)s")
-    )
-    logger.addHandler(stream)
-logger.setLevel(logging.INFO)
 
 
 # ── Pydantic Settings ───────────────────────────────────────
@@ -61,7 +56,7 @@ class Settings(BaseSettings):
     # Ссылка для перехода на главную страницу Cosmos
     STATE_PATH_COSMOS_URL: str
 
-    # Пути к JSON/pickle сессиям
+    # Пути к JSON-файлам сессий (cookies)
     STATE_PATH_SAVEE: str
     STATE_PATH_COSMOS: str
 
@@ -69,6 +64,10 @@ class Settings(BaseSettings):
     LIKES_THRESHOLD: int = Field(20, description="≥ этого числа → hit")
     MAX_FAILS: int = Field(20, description="подряд miss, после которых стоп")
 
+    # Отладка: DEBUG_MODE=1 подменяет LIKES_THRESHOLD низким порогом
+    DEBUG_MODE: bool = False
+    DEBUG_LIKES_THRESHOLD: int = 2
+
     # Скроллинг / клики
     CLICK_PAUSE_SEC: float = 1.5
     SCROLL_DELAY_SEC: float = 2.0
@@ -82,6 +81,30 @@ class Settings(BaseSettings):
     # User-Agent
     USER_AGENT: str
 
+    # Запуск обоих драйверов параллельно при старте (иначе — при первом запросе)
+    WARMUP_DRIVERS: bool = False
+
+    # Один общий Chrome для Savee и Cosmos (см. infra/drivers/shared_chrome.py)
+    SHARE_CHROME: bool = False
+    CHROME_BINARY: str = "google-chrome"
+
+    # Постоянный профиль Chrome для Cosmos (кэш, cookies); None — временный
+    COSMOS_PROFILE_DIR: str | None = None
+    # Скриншот /tmp/cosmos_debug.png, когда число connections не найдено
+    COSMOS_DEBUG_SCREENSHOT: bool = False
+    # Эндпоинт Cosmos, отвечающий 2xx только авторизованным: проверка cookies
+    # одним fetch (CDP Runtime.evaluate) без загрузки приложения;
+    # None — открыть /discover и проверить, не увело ли на /login
+    COSMOS_AUTH_CHECK_URL: str | None = None
+    # CSS-селектор миниатюр ленты discover (сузить до карточек, без аватаров/иконок)
+    COSMOS_THUMB_SELECTOR: str = "img"
+    # Не загружать картинки/видео (CDP setBlockedURLs) — в DOM остаются только src
+    COSMOS_BLOCK_IMAGES: bool = False
+    # Savee: не загружать картинки (Chrome prefs, images=2); src в DOM
+    # остаются, но у <img> без размеров поиск числа «рядом» слабее.
+    # При SHARE_CHROME не действует: pref общий и задел бы вкладку Cosmos
+    SAVEE_BLOCK_IMAGES: bool = False
+
     # Логи / кэш
     LOG_LEVEL: str = Field(
         "INFO", pattern=r"^(INFO|DEBUG|WARNING|ERROR|CRITICAL)$")
@@ -125,8 +148,16 @@ def _mask(val: str) -> str:
     return val[:2] + "***" + val[-2:]
 
 
-logger.info("📦 Settings loaded:")
-for name, value in settings.dict().items():
-    if any(k in name.lower() for k in ("password", "email", "token")):
-        value = _mask(str(value))
-    logger.info("  %-25s = %s", name, value)
+_SENS_RE = re.compile(r"password|email|token", re.IGNORECASE)
+
+# Читаем поля напрямую (без построения settings.dict()) и пишем одной записью
+_dump_lines = "\n".join(
+    "  %-25s = %s" % (
+        name,
+        _mask(str(getattr(settings, name)))
+        if _SENS_RE.search(name)
+        else getattr(settings, name),
+    )
+    for name in Settings.model_fields
+)
+logger.info("📦 Settings loaded:\n%s", _dump_lines)
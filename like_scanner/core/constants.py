@@ -2,123 +2,71 @@
 """
 Like-Scanner: глобальные бизнес-константы.
 
-▪ При старте модуля читаем переменные окружения (если заданы)  
-▪ Каждый final-value выводим в терминал, чтобы DevOps видел,
-  с чем именно поднялся процесс.  
-▪ Никаких внешних зависимостей — «core» остаётся чистым.
+▪ Единственный источник значений — `like_scanner.config.settings`;
+  модуль лишь переэкспортирует их под привычными именами, чтобы
+  переменные окружения не парсились и не логировались дважды.
+▪ Полный дамп настроек (с маскировкой секретов) пишет config.py.
 """
 
 from __future__ import annotations
 
 import logging
-import os
-
-# ─────────────────────────────────────────────
-#  Логгер (один на модуль, предотвращаем дубли)
-# ─────────────────────────────────────────────
-logger = logging.getLogger("like_scanner.constants")
-if not logger.handlers:
-    _h = logging.StreamHandler()
-    _h.setFormatter(
-        logging.Formatter(
-            "[%(asctime)s] %(levelname)-7s %(name)s ▶ %(message)s")
-    )
-    logger.addHandler(_h)
-logger.setLevel(logging.DEBUG)
 
+from like_scanner.config import settings
 
 # ─────────────────────────────────────────────
-#  Helper-функции чтения env-переменных
+#  Логгер (без своих обработчиков — пишет в корневой)
 # ─────────────────────────────────────────────
-def _int_env(var: str, default: int) -> int:
-    val = os.getenv(var)
-    if val is None:
-        return default
-    try:
-        return int(val)
-    except ValueError:
-        logger.warning("ENV %s='%s' не int → fallback=%s", var, val, default)
-        return default
-
-
-def _float_env(var: str, default: float) -> float:
-    val = os.getenv(var)
-    if val is None:
-        return default
-    try:
-        return float(val)
-    except ValueError:
-        logger.warning("ENV %s='%s' не float → fallback=%s", var, val, default)
-        return default
+logger = logging.getLogger("like_scanner.constants")
 
 
 # ─────────────────────────────────────────────
 #  Бизнес-пороговые значения
 # ─────────────────────────────────────────────
-LIKES_THRESHOLD: int = _int_env("LIKES_THRESHOLD", 20)
-MAX_FAILS: int = _int_env("MAX_FAILS", 20)
+LIKES_THRESHOLD: int = settings.LIKES_THRESHOLD
+MAX_FAILS: int = settings.MAX_FAILS
 
 # Для отладки: если установлена переменная DEBUG_MODE=1, используем очень низкий порог лайков
-if os.getenv("DEBUG_MODE") == "1":
-    debug_threshold = _int_env("DEBUG_LIKES_THRESHOLD", 2)
+if settings.DEBUG_MODE:
     logger.warning(
-        f"ОТЛАДКА: Установлен низкий порог лайков: {debug_threshold} (обычно {LIKES_THRESHOLD})")
-    LIKES_THRESHOLD = debug_threshold
+        "ОТЛАДКА: Установлен низкий порог лайков: %s (обычно %s)",
+        settings.DEBUG_LIKES_THRESHOLD, LIKES_THRESHOLD)
+    LIKES_THRESHOLD = settings.DEBUG_LIKES_THRESHOLD
 
 # ─────────────────────────────────────────────
 #  Тайминги Selenium / парсинга
 # ─────────────────────────────────────────────
-CLICK_PAUSE_SEC: float = _float_env("CLICK_PAUSE_SEC", 1.5)
-SCROLL_DELAY_SEC: float = _float_env("SCROLL_DELAY_SEC", 1.0)
-INITIAL_SCROLLS: int = _int_env("INITIAL_SCROLLS", 2)
+CLICK_PAUSE_SEC: float = settings.CLICK_PAUSE_SEC
+# Прежний constants.py по умолчанию давал 1.0 с (Settings, который читают
+# драйверы, — 2.0 с); без SCROLL_DELAY_SEC в окружении сохраняем 1.0 с
+SCROLL_DELAY_SEC: float = (
+    settings.SCROLL_DELAY_SEC
+    if "SCROLL_DELAY_SEC" in settings.model_fields_set else 1.0
+)
+INITIAL_SCROLLS: int = settings.INITIAL_SCROLLS
 
 # ─────────────────────────────────────────────
-#  User-Agent по умолчанию (можно переопределить)
+#  User-Agent
 # ─────────────────────────────────────────────
-DEFAULT_USER_AGENT: str = os.getenv(
-    "USER_AGENT",
-    "Mozilla/5.0 (X11; Linux x86_64) LikeScanner/1.0 (+https://gr-group.example)",
-)
+DEFAULT_USER_AGENT: str = settings.USER_AGENT
 
 # ─────────────────────────────────────────────
 #  Пути и токены для авторизации / кэша
 # ─────────────────────────────────────────────
-# Savee: авторизация одной magic-ссылкой, куки храним в JSON
-SAVEE_MAGIC_LINK_URL: str | None = os.getenv("STATE_PATH_SAVEE_URL")
-STATE_PATH_SAVEE: str | None = os.getenv("STATE_PATH_SAVEE")
+# Savee: авторизация одной magic-ссылкой
+SAVEE_MAGIC_LINK_URL: str = settings.STATE_PATH_SAVEE_URL
+STATE_PATH_SAVEE: str = settings.STATE_PATH_SAVEE
 
-# Cosmos: обычный e-mail / пароль, плюс JSON-cookies
-STATE_PATH_COSMOS: str | None = os.getenv("STATE_PATH_COSMOS")
+# Cosmos: обычный e-mail / пароль
+STATE_PATH_COSMOS: str = settings.STATE_PATH_COSMOS
 
 # ─────────────────────────────────────────────
 #  Дополнительные лимиты и задержки (из старого проекта)
 # ─────────────────────────────────────────────
-DAILY_IMAGE_LIMIT: int = _int_env("DAILY_IMAGE_LIMIT", 400)
-SCROLL_ITERATIONS: int = _int_env("SCROLL_ITERATIONS", 1)
-GOOGLE_SEARCH_DELAY_SEC: int = _int_env("GOOGLE_SEARCH_DELAY_SEC", 5)
-
-# Пути для логов и кэша (не критично для core-логики,
-# но выводим в _dump() чтобы DevOps видел, что подхватилось)
-LOG_PATH: str | None = os.getenv("LOG_PATH")
-IMAGE_CACHE_PATH: str | None = os.getenv("IMAGE_CACHE_PATH")
-
-# ─────────────────────────────────────────────
-#  Dump всех актуальных значений при импорте
-# ─────────────────────────────────────────────
-
-
-def _dump() -> None:
-    logger.info("🚀 Like-Scanner constants загружены:")
-    for k, v in sorted(globals().items()):
-        if k.isupper():
-            logger.info("  %-17s = %s", k, v)
-
-        # Предупреждение, если не передали magic-ссылку Savee
-        if not SAVEE_MAGIC_LINK_URL:
-            logger.warning(
-                "ENV STATE_PATH_SAVEE_URL не задан — драйвер Savee "
-                "не сможет авторизоваться через magic-link."
-            )
-
+DAILY_IMAGE_LIMIT: int = settings.DAILY_IMAGE_LIMIT
+SCROLL_ITERATIONS: int = settings.SCROLL_ITERATIONS
+GOOGLE_SEARCH_DELAY_SEC: int = settings.GOOGLE_SEARCH_DELAY_SEC
 
-_dump()
+# Пути для логов и кэша
+LOG_PATH: str | None = settings.LOG_PATH
+IMAGE_CACHE_PATH: str | None = settings.IMAGE_CACHE_PATH
@@ -6,43 +6,67 @@ Domain-модели Like-Scanner'а.
 * **ScanResult** – результат обработки одной карточки.
 * **ConfigRow**  – строка из листа `config` (Google Sheets).
 
-Все конструкторы логируют своё создание, чтобы в терминале
-был чёткий «трейл» действий пайплайна.
+Конструкторы моделей ничего не логируют: «трейл» пайплайна пишут
+вызывающие (`SessionTracker.continue_parse`, `services.evaluate`).
 """
 
 from __future__ import annotations
 
 import logging
-from datetime import datetime
-from typing import Optional
-from dataclasses import dataclass
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache, partial
+from typing import Callable, Literal, Optional
+from dataclasses import dataclass, field
 
-from pydantic import BaseModel, Field, validator
+from pydantic import TypeAdapter
 
-from .constants import LIKES_THRESHOLD
+from .constants import LIKES_THRESHOLD, MAX_FAILS
 
-from typing import TYPE_CHECKING
-if TYPE_CHECKING:
-    from .models import ScanResult  # for type hints inside continue_parse
+# Парсеры импортируем один раз при загрузке модуля (драйверы не зависят
+# от core.models, так что цикла нет), а не на каждом вызове continue_parse
+from like_scanner.infra.drivers.savee_driver import parse_savee_profile
+from like_scanner.infra.drivers.cosmos_driver import CosmosDriver, parse_cosmos_profile
+
+# Тип драйвера → функция парсинга профиля (сверяется через isinstance, так
+# что подклассы и обёртки-наследники тоже подходят). Всё остальное
+# (обычный webdriver.Chrome) считается драйвером Savee.
+_PARSERS: dict[type, Callable[..., dict]] = {
+    CosmosDriver: parse_cosmos_profile,
+}
 
 # ──────────────────────────────
 # Глобальный логгер для моделей
 # ──────────────────────────────
+# Своих обработчиков нет: записи уходят в корневой QueueHandler
+# (infra/logging_conf.py), а запись на диск/в консоль делает фоновый
+# QueueListener — в потоке сканера остаётся только queue.put().
 logger = logging.getLogger("like_scanner.models")
-if not logger.handlers:                       # не плодим дубликаты при повторном импорте
-    _h = logging.StreamHandler()
-    _h.setFormatter(
-        logging.Formatter(
-            "[%(asctime)s] %(levelname)-7s %(name)s ▶ %(message)s")
-    )
-    logger.addHandler(_h)
-logger.setLevel(logging.DEBUG)
+# Уровень задаётся один раз в logging_conf (импортируется первым в app.py),
+# поэтому флаг DEBUG считаем при импорте, а не на каждой карточке
+_DEBUG_ON: bool = logger.isEnabledFor(logging.DEBUG)
 
 
 # ══════════════════════════════
 #            MODELS
 # ══════════════════════════════
-class MediaItem(BaseModel):
+@lru_cache(maxsize=1)
+def _utc_second(sec: int) -> datetime:
+    return datetime.fromtimestamp(sec, timezone.utc)
+
+
+def _utc_now() -> datetime:
+    """Текущее UTC-время с точностью до секунды; один datetime на секунду."""
+    return _utc_second(int(time.time()))
+
+
+# Модели — простые dataclass(slots=True): внутри скан-цикла они только
+# переносят данные, а сериализацию на границе API делает FastAPI/pydantic
+# (response_model принимает dataclass напрямую). Проверки из __post_init__ —
+# пара сравнений, поэтому выполняются всегда (и под `python -O`).
+@dataclass(slots=True)
+class MediaItem:
     """
     Представление одной медиа-карточки в профиле.
 
@@ -52,30 +76,21 @@ class MediaItem(BaseModel):
     * `scraped_at` – UTC-время, когда бот увидел карточку
     """
 
-    index: int = Field(..., ge=0)
-    url: str = Field(..., description="Absolute http(s) media URL")
-    saves: int = Field(..., ge=0)
-    scraped_at: datetime = Field(default_factory=datetime.utcnow)
+    index: int
+    url: str
+    saves: int
+    scraped_at: datetime = field(default_factory=_utc_now)
 
-    # ——— валидаторы ———
-    @validator("url")
-    def _url_must_be_http(cls, v: str) -> str:
-        if not v.startswith(("http://", "https://")):
+    # ——— валидация ———
+    def __post_init__(self) -> None:
+        if self.index < 0 or self.saves < 0:
+            raise ValueError("index and saves must be >= 0")
+        if not self.url.startswith(("http://", "https://")):
             raise ValueError("url must start with http:// or https://")
-        return v
-
-    # ——— Хук: логируем создание модели ———
-    def __init__(self, **data):
-        super().__init__(**data)
-        logger.debug(
-            "MediaItem  idx=%-4s saves=%-3s url=%s",
-            self.index,
-            self.saves,
-            self.url[:80] + ("…" if len(self.url) > 80 else ""),
-        )
 
 
-class ScanResult(BaseModel):
+@dataclass(slots=True)
+class ScanResult:
     """
     Результат однократного вызова парсера (`process_one`).
 
@@ -86,46 +101,42 @@ class ScanResult(BaseModel):
     """
 
     hit: bool
-    next_index: int = Field(..., ge=0)
+    next_index: int
     item: Optional[MediaItem] = None
     error: Optional[str] = None
 
     # ——— гарантируем консистентность ———
-    @validator("item", always=True)
-    def _item_required_on_hit(cls, v, values):
-        if values.get("hit") and v is None and not values.get("error"):
+    def __post_init__(self) -> None:
+        if self.next_index < 0:
+            raise ValueError("next_index must be >= 0")
+        if self.hit and self.item is None and not self.error:
             raise ValueError("item must be provided when hit is True")
-        return v
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        # ——— Логируем результат ———
-        if self.error:
-            logger.warning(
-                "ScanResult ERROR='%s' next_index=%s", self.error, self.next_index
-            )
-        else:
-            logger.info(
-                "ScanResult hit=%s  saves=%s  next_index=%s",
-                self.hit,
-                self.item.saves if self.item else "—",
-                self.next_index,
-            )
+
+_PLATFORMS = frozenset({"savee", "cosmos"})
 
 
-class ConfigRow(BaseModel):
+@dataclass(slots=True)
+class ConfigRow:
     """
     Строка конфигурации из листа **config** Google Sheets.
     """
 
-    index: int = Field(..., ge=0)
+    index: int
     profile_url: str
-    platform: str = Field(pattern=r"^(savee|cosmos)$")
+    platform: Literal["savee", "cosmos"]
+
+    def __post_init__(self) -> None:
+        if self.index < 0:
+            raise ValueError("index must be >= 0")
+        if self.platform not in _PLATFORMS:
+            raise ValueError("platform must be 'savee' or 'cosmos'")
+
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        logger.debug("ConfigRow  idx=%s  platform=%s  url=%s",
-                     self.index, self.platform, self.profile_url)
+# Пакетная валидация строк листа config одним проходом pydantic-core
+# вместо `[ConfigRow(**r) for r in rows]`:
+#     rows = CONFIG_ROWS.validate_python(sheet_rows)
+CONFIG_ROWS: TypeAdapter[list[ConfigRow]] = TypeAdapter(list[ConfigRow])
 
 
 # ══════════════════════════════
@@ -140,31 +151,53 @@ class SessionTracker:
     * `settings`    – объект настроек (config.Settings), опц.
     * `next_index`  – индекс, который нужно обработать при следующем вызове
     * `fails`       – сколько подряд miss'ов было
+    * `max_fails`   – лимит miss'ов подряд, после которого прогон останавливается
+    * `profile_url` – URL профиля (опц.); если не задан, на каждом шаге
+      читается текущий URL браузера (браузер мог перейти на другой профиль)
+    * `threshold`   – порог hit (LIKES_THRESHOLD), фиксируется при создании
     """
     driver: object | None = None
     settings: object | None = None
     next_index: int = 0
     fails: int = 0
-
-    def hit(self, step: int = 1) -> None:
-        """Картинка подошла под порог – сбрасываем fails и двигаем индекс."""
-        self.next_index += step
-        self.fails = 0
-        logger.debug("SessionTracker.hit() → next_index=%s fails=%s",
-                     self.next_index, self.fails)
-
-    def miss(self, step: int = 1) -> None:
-        """Картинка НЕ подошла – увеличиваем fails и индекс."""
+    max_fails: int = MAX_FAILS
+    profile_url: str | None = None
+    threshold: int = field(init=False)
+    _parse: Callable[[str, int], dict] | None = field(init=False, repr=False)
+    _parser_name: str = field(init=False, repr=False)
+    _browser: object | None = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Браузер и парсер привязываются при первом continue_parse (_bind):
+        # трекер создаётся в async-роуте, а `CosmosDriver.browser` у ленивого
+        # драйвера запускает Chrome — это должно происходить в threadpool
+        self._browser = None
+        self._parse = None
+        self._parser_name = ""
+        # Порог фиксируем на старте сессии
+        self.threshold = int(LIKES_THRESHOLD)
+
+    def _bind(self) -> None:
+        """Один раз выбирает парсер по типу драйвера и привязывает браузер."""
+        parser = next(
+            (p for cls, p in _PARSERS.items() if isinstance(self.driver, cls)),
+            parse_savee_profile)
+        # CosmosDriver — обёртка: Selenium-вызовы идут в его `.browser`
+        self._browser = getattr(self.driver, "browser", self.driver)
+        # На карточку остаётся вызов (url, index)
+        self._parse = partial(parser, self._browser)
+        self._parser_name = parser.__name__
+
+    def update(self, is_hit: bool, step: int = 1) -> None:
+        """Сдвигает индекс; hit сбрасывает fails, miss — увеличивает."""
         self.next_index += step
-        self.fails += 1
-        logger.debug("SessionTracker.miss() → next_index=%s fails=%s",
-                     self.next_index, self.fails)
+        self.fails = 0 if is_hit else self.fails + 1
 
     def to_dict(self) -> dict:
         """Удобно логировать или записывать в Sheets."""
         return {"next_index": self.next_index, "fails": self.fails}
 
-    def continue_parse(self) -> "ScanResult":
+    def continue_parse(self) -> ScanResult:
         """
         Выполняет парсинг для текущего индекса и определяет "hit" на основе количества сохранений.
 
@@ -174,19 +207,12 @@ class SessionTracker:
         Returns:
             ScanResult с результатом парсинга и hit=True, если saves >= LIKES_THRESHOLD.
         """
-        # Импортируем парсеры здесь, чтобы избежать циклических импортов
-        from like_scanner.infra.drivers.savee_driver import parse_savee_profile
-        from like_scanner.infra.drivers.cosmos_driver import parse_cosmos_profile
-        from .constants import LIKES_THRESHOLD
-
-        # Логируем важную отладочную информацию о пороге
-        logger.info(
-            f"ДИАГНОСТИКА: Проверка изображений с индекса {self.next_index}, порог LIKES_THRESHOLD={LIKES_THRESHOLD}")
+        threshold = self.threshold
 
         if not self.driver:
             logger.warning(
                 "Драйвер не инициализирован при вызове continue_parse")
-            self.miss(step=1)
+            self.update(False)
             return ScanResult(
                 hit=False,
                 next_index=self.next_index,
@@ -194,99 +220,72 @@ class SessionTracker:
                 error="Драйвер не инициализирован"
             )
 
-        # Определяем, какой драйвер используется - Savee или Cosmos
-        driver_type = str(type(self.driver)).lower()
-        logger.info(f"ДИАГНОСТИКА: Тип драйвера: {driver_type}")
-
         try:
-            # Получаем текущий URL или используем дефолтный для платформы
-            current_url = self.driver.current_url
-            logger.info(f"ДИАГНОСТИКА: Текущий URL: {current_url}")
+            if self._parse is None:
+                self._bind()
+
+            # Явно заданный URL профиля; иначе — где сейчас браузер
+            current_url = self.profile_url or self._browser.current_url
 
             # Не уменьшаем индекс на 1, используем точно переданный индекс
             start_idx = self.next_index
-
-            # Определяем, какую функцию парсинга использовать
-            logger.info(f"ДИАГНОСТИКА: Начинаем парсинг с индекса {start_idx}")
-            if "cosmos" in driver_type:
-                logger.info(
-                    f"Определен драйвер Cosmos, парсим по индексу {start_idx}")
-                # Парсим профиль Cosmos
-                result = parse_cosmos_profile(
-                    self.driver, current_url, start_idx)
-            else:
-                logger.info(
-                    f"Определен драйвер Savee, парсим по индексу {start_idx}")
-                # Парсим профиль Savee
-                result = parse_savee_profile(
-                    self.driver, current_url, start_idx)
-
-            logger.info(f"ДИАГНОСТИКА: Результат парсинга: {result}")
+            result = self._parse(current_url, start_idx)
 
             # Проверяем результат
             if result.get("error"):
-                logger.warning(f"Ошибка при парсинге: {result['error']}")
-                self.miss(step=1)
+                logger.warning("Ошибка при парсинге: %s", result['error'])
+                self.update(False)
                 return ScanResult(
                     hit=False,
-                    next_index=self.next_index,  # Используем обновленный индекс после miss()
+                    next_index=self.next_index,  # Используем обновленный индекс после update()
                     error=result.get("error")
                 )
 
             # Определяем "hit" на основе сравнения с порогом
             image_url = result.get("image_url")
-            saves_count = result.get("saves", 0)
+            # Граница с парсерами: int() здесь дешёвый, а None/строка из
+            # драйвера иначе уронили бы сравнение с порогом ниже
+            saves_count = int(result.get("saves") or 0)
 
             # Если получено достаточное количество сохранений, считаем это hit
-            # Принудительно приводим к int для гарантии корректного сравнения
-            saves_count = int(saves_count)
-            is_hit = saves_count >= LIKES_THRESHOLD
+            is_hit = saves_count >= threshold
 
-            logger.info(
-                f"ДИАГНОСТИКА: Сравниваем {saves_count} >= {LIKES_THRESHOLD} = {is_hit}")
-
-            # Не вызываем hit() и miss() здесь, т.к. они изменяют next_index
+            # Не вызываем update() здесь, т.к. он изменяет next_index
             # Логируем только результат сравнения
-            if is_hit:
-                logger.info(
-                    f"HIT! Изображение {image_url} имеет {saves_count} сохранений (>= {LIKES_THRESHOLD})")
-            else:
-                logger.info(
-                    f"MISS. Изображение {image_url} имеет {saves_count} сохранений (< {LIKES_THRESHOLD})")
-
-            # Обновляем счетчик fails непосредственно здесь
-            if is_hit:
-                self.fails = 0
-            else:
-                self.fails += 1
+            logger.info("%s idx=%s saves=%s (порог %s) url=%s",
+                        "HIT" if is_hit else "MISS", start_idx, saves_count,
+                        threshold, image_url)
+
+            # Обновляем счетчик fails непосредственно здесь (индекс берём из парсера)
+            self.fails = 0 if is_hit else self.fails + 1
 
             # Создаем MediaItem только если это hit
+            # (позиционно: index, url, saves — без kwargs-словаря на карточку)
             item = None
             if is_hit and image_url:
-                item = MediaItem(
-                    index=start_idx,  # исходный индекс
-                    url=image_url,
-                    saves=saves_count
-                )
+                item = MediaItem(start_idx, image_url, saves_count)
 
             # Сохраняем next_index из результата парсинга, если он есть
             next_idx = result.get("next_index", self.next_index)
 
-            # Возвращаем результат парсинга с обновленным индексом
-            scan_result = ScanResult(
-                hit=is_hit,
-                next_index=next_idx,  # Берем индекс из результата парсера
-                item=item,
-                error=None
-            )
-
-            logger.info(
-                f"ДИАГНОСТИКА: Возвращаем результат: hit={is_hit}, next_index={next_idx}, saves={saves_count}")
+            # Возвращаем результат парсинга с индексом из результата парсера
+            # (позиционно: hit, next_index, item)
+            scan_result = ScanResult(is_hit, next_idx, item)
+
+            # Вся диагностика шага — одной записью и только на уровне DEBUG
+            if _DEBUG_ON:
+                logger.debug(
+                    "scan step parser=%s url=%s idx=%s next=%s result=%s",
+                    self._parser_name, current_url, start_idx, next_idx, result,
+                    extra={"idx": start_idx, "url": current_url,
+                           "parser": self._parser_name, "saves": saves_count,
+                           "hit": is_hit, "next_index": next_idx},
+                )
             return scan_result
 
         except Exception as e:
-            logger.exception(f"Ошибка в процессе парсинга: {e}")
-            self.miss(step=1)
+            logger.exception("Ошибка в процессе парсинга: %s", e)
+            self.update(False)
             return ScanResult(
                 hit=False,
                 next_index=self.next_index,
@@ -294,7 +293,27 @@ class SessionTracker:
             )
 
 
+def scan_batch(trackers: list[SessionTracker]) -> list[ScanResult]:
+    """
+    Выполняет `continue_parse` для нескольких профилей параллельно.
+
+    Каждый трекер должен владеть своим драйвером: Selenium-сессия не
+    потокобезопасна, а пока браузер отвечает на RPC, GIL отпущен — так что
+    N профилей сканируются почти за время одного. Порядок результатов
+    совпадает с порядком `trackers`.
+    """
+    # Трекеры без драйвера не в счёт: continue_parse сам вернёт им ошибку
+    drivers = [id(t.driver) for t in trackers if t.driver is not None]
+    if len(set(drivers)) != len(drivers):
+        raise ValueError("each tracker must own a separate driver")
+    if len(trackers) <= 1:
+        return [t.continue_parse() for t in trackers]
+    with ThreadPoolExecutor(max_workers=len(trackers)) as pool:
+        return list(pool.map(SessionTracker.continue_parse, trackers))
+
+
 # ──────────────────────────────
 # Модуль загружен
 # ──────────────────────────────
-logger.debug("models.py loaded — LIKES_THRESHOLD=%s", LIKES_THRESHOLD)
+if _DEBUG_ON:
+    logger.debug("models.py loaded — LIKES_THRESHOLD=%s", LIKES_THRESHOLD)
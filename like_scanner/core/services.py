@@ -18,116 +18,85 @@ from __future__ import annotations
 import logging
 from typing import Optional
 
-from .constants import LIKES_THRESHOLD, MAX_FAILS
-from .models import MediaItem, ScanResult
+from .models import MediaItem, ScanResult, SessionTracker
 
 # ──────────────────────────────
 #  Логгер
 # ──────────────────────────────
+# Своих обработчиков нет: записи уходят в корневой QueueHandler
+# (infra/logging_conf.py), а запись на диск/в консоль делает фоновый
+# QueueListener — в потоке сканера остаётся только queue.put().
 logger = logging.getLogger("like_scanner.services")
-if not logger.handlers:
-    _h = logging.StreamHandler()
-    _h.setFormatter(
-        logging.Formatter(
-            "[%(asctime)s] %(levelname)-7s %(name)s ▶ %(message)s")
-    )
-    logger.addHandler(_h)
-logger.setLevel(logging.DEBUG)
+# Уровень задаётся один раз в logging_conf — флаг DEBUG кэшируем при импорте
+_DEBUG_ON: bool = logger.isEnabledFor(logging.DEBUG)
 
 
 # ══════════════════════════════
-#  SessionTracker
+#  Решение hit / miss
 # ══════════════════════════════
-class SessionTracker:
+def _decide(
+    saves: int, index: int, fails: int, max_fails: int, threshold: int
+) -> tuple[bool, int, int, bool]:
     """
-    Держит состояние одного «прогона» парсера.
+    Чистая целочисленная логика одной карточки (без логов и моделей).
 
-    ➤ `current_index`        – какой элемент сейчас парсер откроет  
-    ➤ `consecutive_fails`    – подряд идущие miss’ы (для cut-off)  
-    ➤ `max_fails`            – лимит, после которого останавливаемся
+    Возвращает `(hit, next_index, fails, stop)`: hit сбрасывает счётчик
+    неудач, miss увеличивает его; `stop` — достигнут лимит `max_fails`.
     """
+    if saves >= threshold:
+        return True, index + 1, 0, False
+    fails += 1
+    return False, index + 1, fails, fails >= max_fails
 
-    def __init__(self, start_index: int, max_fails: int = MAX_FAILS):
-        self.current_index: int = start_index
-        self.consecutive_fails: int = 0
-        self.max_fails: int = max_fails
-        logger.info(
-            "📌 Session started  start_index=%s  max_fails=%s",
-            self.current_index,
-            self.max_fails,
-        )
-
-    # ──────────────────────────
-    #  Публичный API
-    # ──────────────────────────
-    def evaluate(
-        self, saves: Optional[int], url: Optional[str] = None
-    ) -> ScanResult:
-        """
-        Получает данные карточки и решает, что делать дальше.
-
-        * `saves=None`  → карточка не была найдена (index вышел за предел)
-        * `saves < LIKES_THRESHOLD` → miss
-        * `saves >= LIKES_THRESHOLD` → hit
-        """
+
+# ══════════════════════════════
+#  evaluate
+# ══════════════════════════════
+def evaluate(
+    tracker: SessionTracker, saves: Optional[int], url: Optional[str] = None
+) -> ScanResult:
+    """
+    Получает данные карточки и решает, что делать дальше.
+
+    Состояние прогона хранит единственный `models.SessionTracker`
+    (`next_index`, `fails`, `max_fails`, `threshold`); функция лишь
+    обновляет его.
+
+    * `saves=None`  → карточка не была найдена (index вышел за предел)
+    * `saves < LIKES_THRESHOLD` → miss
+    * `saves >= LIKES_THRESHOLD` → hit
+    """
+    threshold = tracker.threshold
+    index = tracker.next_index
+    if _DEBUG_ON:
         logger.debug(
-            "Eval index=%s saves=%s (threshold=%s)", self.current_index, saves, LIKES_THRESHOLD
-        )
-
-        # ░░░ 1. Case: reached end of profile  ░░░
-        if saves is None:
-            result = ScanResult(
-                hit=False,
-                next_index=self.current_index,  # не меняем, профиль закончился
-                error="end_of_profile",
-            )
-            logger.info("🔚 Profile ended at index=%s", self.current_index)
-            return result
-
-        # ░░░ 2. Case: hit ░░░
-        if saves >= LIKES_THRESHOLD:
-            item = MediaItem(index=self.current_index,
-                             url=url or "", saves=saves)
-            result = ScanResult(
-                hit=True,
-                next_index=self.current_index + 1,
-                item=item,
-            )
-            # сбрасываем счётчик неудач
-            self.consecutive_fails = 0
-            logger.info(
-                "✅ HIT  idx=%s  saves=%s  next=%s",
-                item.index,
-                item.saves,
-                result.next_index,
-            )
-            self.current_index += 1
-            return result
-
-        # ░░░ 3. Case: miss ░░░
-        self.consecutive_fails += 1
+            "Eval index=%s saves=%s (threshold=%s)", index, saves, threshold)
+
+    # ░░░ 1. Case: reached end of profile  ░░░
+    if saves is None:
+        logger.info("🔚 Profile ended at index=%s", index)
+        # не меняем индекс, профиль закончился
+        return ScanResult(hit=False, next_index=index, error="end_of_profile")
+
+    # ░░░ 2/3. Case: hit / miss — чистая целочисленная часть в _decide ░░░
+    hit, next_index, fails, stop = _decide(
+        saves, index, tracker.fails, tracker.max_fails, threshold)
+    # MediaItem может не пройти проверку — состояние меняем после неё
+    item = MediaItem(index, url or "", saves) if hit else None
+    tracker.next_index = next_index
+    tracker.fails = fails
+
+    if hit:
+        logger.info(
+            "✅ HIT  idx=%s  saves=%s  next=%s", index, saves, next_index)
+        return ScanResult(True, next_index, item)
+
+    if _DEBUG_ON:
         logger.debug(
-            "❌ MISS idx=%s  fails_in_row=%s/%s",
-            self.current_index,
-            self.consecutive_fails,
-            self.max_fails,
-        )
-
-        # достигли лимита «no hits»
-        if self.consecutive_fails >= self.max_fails:
-            result = ScanResult(
-                hit=False,
-                next_index=self.current_index + 1,
-                error="no_hits",
-            )
-            logger.warning(
-                "🛑 MAX_FAILS reached (%s). Stopping scan.", self.consecutive_fails
-            )
-        else:
-            result = ScanResult(
-                hit=False,
-                next_index=self.current_index + 1,
-            )
-
-        self.current_index += 1
-        return result
+            "❌ MISS idx=%s  fails_in_row=%s/%s", index, fails, tracker.max_fails)
+
+    # достигли лимита «no hits»
+    if stop:
+        logger.warning("🛑 MAX_FAILS reached (%s). Stopping scan.", fails)
+        return ScanResult(hit=False, next_index=next_index, error="no_hits")
+    return ScanResult(False, next_index)
@@ -0,0 +1,34 @@
+"""
+Файловое хранилище cookies для драйверов Savee и Cosmos.
+
+Cookies Selenium — список простых dict'ов со строками/числами, поэтому
+храним их в JSON (быстрее и безопаснее pickle; (де)сериализует orjson). Запись атомарная:
+`<path>.tmp` + `os.replace`, так что сбой посреди записи не оставляет
+обрезанный файл, из-за которого пришлось бы логиниться заново.
+"""
+
+import os
+from typing import Any, Dict, List, Set
+
+import orjson
+
+# Каталоги, уже созданные этим процессом: makedirs — только на первой записи
+_created_dirs: Set[str] = set()
+
+
+def load_cookies(path: str) -> List[Dict[str, Any]]:
+    """Читает cookies из JSON-файла (FileNotFoundError, если файла нет)."""
+    with open(path, "rb") as fh:
+        return orjson.loads(fh.read())
+
+
+def save_cookies(path: str, cookies: List[Dict[str, Any]]) -> None:
+    """Атомарно записывает cookies в JSON-файл, создавая каталог при нужде."""
+    directory = os.path.dirname(path) or "."
+    if directory not in _created_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _created_dirs.add(directory)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(orjson.dumps(cookies))
+    os.replace(tmp_path, path)
@@ -1,24 +1,53 @@
+import atexit
 import json
 import logging
 import os
-import pickle
-import time
-from typing import List, Dict, Any
-
+import re
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from html.parser import HTMLParser
+from typing import Iterator, List, Dict, Any, Tuple
+from urllib.parse import urlparse
+
+import requests
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.keys import Keys
 
 # Import settings values (paths, URLs, user‑agent)
 from like_scanner.config import settings
+from like_scanner.infra.drivers import cookie_store, shared_chrome
 
 STATE_PATH_COSMOS = settings.STATE_PATH_COSMOS
 STATE_PATH_COSMOS_URL = settings.STATE_PATH_COSMOS_URL
 USER_AGENT = settings.USER_AGENT
+# Host whose cookies make up the Cosmos session (e.g. "www.cosmos.so")
+_COSMOS_HOST = urlparse(STATE_PATH_COSMOS_URL).hostname or ""
+
+# driver.get() returns at DOMContentLoaded: feed thumbnails, fonts and
+# trackers keep loading in the background; every wait below is explicit
+PAGE_LOAD_STRATEGY = "eager"
+
+# Chrome's browser/renderer IPC lives in /dev/shm. Docker's default 64 MB
+# is too small and tabs crash, so there Chrome is told to use /tmp instead
+# (--disable-dev-shm-usage) — slower, disk-backed. Containers started with
+# `--shm-size=1g` (or hosts with a normal tmpfs) keep the fast path.
+_MIN_DEV_SHM_BYTES = 512 * 1024 * 1024
+
+
+def _dev_shm_too_small() -> bool:
+    try:
+        st = os.statvfs("/dev/shm")
+    except OSError:
+        return True
+    return st.f_frsize * st.f_blocks < _MIN_DEV_SHM_BYTES
+
 
 # --------------------------------------------------------------------------- #
 # Logging setup
@@ -27,6 +56,138 @@ logger = logging.getLogger("cosmos")
 logger.setLevel(logging.INFO)
 
 
+# Rendered URL (`currentSrc`, i.e. the srcset candidate actually chosen) or
+# plain `src` of the elements matching the selector in arguments[0], one
+# page at a time: elements [arguments[1], arguments[1] + arguments[2]).
+# Returns [srcs, more] — `more` is false once the page reached the end.
+_THUMB_SRCS_JS = """
+var els = document.querySelectorAll(arguments[0]);
+var end = Math.min(els.length, arguments[1] + arguments[2]);
+var srcs = [];
+for (var i = arguments[1]; i < end; i++) {
+    var src = els[i].currentSrc || els[i].src;
+    if (src) srcs.push(src);
+}
+return [srcs, end < els.length];
+"""
+
+# Thumbnails fetched per execute_script in iter_media
+_MEDIA_PAGE_SIZE = 200
+
+
+class _ImgSrcCollector(HTMLParser):
+    """Collects `src` of every <img> in server-rendered HTML."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.srcs: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, str | None]]) -> None:
+        if tag == "img":
+            src = dict(attrs).get("src")
+            if src:
+                self.srcs.append(src)
+
+
+# URL patterns for Network.setBlockedURLs: media (scanning with
+# COSMOS_BLOCK_IMAGES) and, during login, also fonts and trackers
+_BLOCKED_MEDIA_URLS = (
+    "*.jpg", "*.jpeg", "*.png", "*.webp", "*.gif", "*.mp4",
+)
+_LOGIN_BLOCKED_URLS = _BLOCKED_MEDIA_URLS + (
+    "*.woff", "*.woff2", "*google-analytics*", "*googletagmanager*", "*doubleclick*",
+)
+
+# Auth-gated page opened once after restoring cookies
+_SESSION_PROBE_URL = f"{STATE_PATH_COSMOS_URL}/discover"
+
+# Static same-origin document for the API auth probe: fetch() needs a
+# cosmos.so page to send credentials, and a plain text file loads no app JS
+_AUTH_PROBE_ORIGIN_URL = f"{STATE_PATH_COSMOS_URL}/robots.txt"
+
+# Promise with the HTTP status of a credentialed GET (0 on network error),
+# awaited by CDP Runtime.evaluate; %s is the JSON-quoted URL
+_AUTH_PROBE_EXPR = (
+    "fetch(%s, {credentials: 'include'})"
+    ".then(function (r) { return r.status; })"
+    ".catch(function () { return 0; })"
+)
+
+
+# Credential inputs by selector priority: [email input, password input]
+_LOGIN_INPUTS_JS = """
+function first(selectors) {
+    for (var i = 0; i < selectors.length; i++) {
+        var el = document.querySelector(selectors[i]);
+        if (el) return el;
+    }
+    return null;
+}
+return [
+    first(['#username', '[name="identifier"]', '[name="email"]',
+           'input[type="email"]', 'input[placeholder*="Email"]',
+           'input[autocomplete="username"]']),
+    first(['#password', '[name="password"]', 'input[type="password"]',
+           'input[autocomplete="current-password"]'])
+];
+"""
+
+
+# Fill email + password at once: drop readonly, set the value through the
+# native setter (so framework-controlled inputs see it) and fire input/change.
+# Returns true when both fields hold the expected values.
+_FILL_CREDENTIALS_JS = """
+var setValue = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+function fill(el, value) {
+    el.removeAttribute('readonly');
+    el.focus();
+    setValue.call(el, value);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    return el.value === value;
+}
+return fill(arguments[0], arguments[2]) && fill(arguments[1], arguments[3]);
+"""
+
+# Redirect waits after submitting the form poll every 100 ms instead of the
+# default 500 ms, so a fast login is noticed almost immediately
+_REDIRECT_POLL_SEC = 0.1
+
+
+def _on_login_page(driver) -> bool:
+    """Wait condition: still on the login page (case-insensitive, "/Login" too)."""
+    return "login" in driver.current_url.lower()
+
+# Sign-in button by priority: test id, submit button, any button saying "enter"
+_LOGIN_BTN_JS = """
+var btn = document.querySelector('[data-testid="Login_SignInBtn"]')
+    || document.querySelector('button[type="submit"]');
+if (btn) return btn;
+var buttons = document.getElementsByTagName('button');
+for (var i = 0; i < buttons.length; i++) {
+    if (buttons[i].textContent.toLowerCase().indexOf('enter') >= 0) return buttons[i];
+}
+return null;
+"""
+
+
+# --------------------------------------------------------------------------- #
+# Helper: cookie conversion
+# --------------------------------------------------------------------------- #
+def _cdp_cookie(ck: Dict[str, Any]) -> Dict[str, Any]:
+    """Selenium cookie dict → CDP `Network.CookieParam`."""
+    param = {
+        key: ck[key]
+        for key in ("name", "value", "domain", "path", "secure", "httpOnly")
+        if key in ck
+    }
+    if "expiry" in ck:
+        param["expires"] = ck["expiry"]
+    if ck.get("sameSite") in ("Strict", "Lax", "None"):
+        param["sameSite"] = ck["sameSite"]
+    return param
+
+
 # --------------------------------------------------------------------------- #
 # Helper: classic username/password login
 # --------------------------------------------------------------------------- #
@@ -52,10 +213,7 @@ def perform_cosmos_login(
     logger.debug("Opening Cosmos login page: %s", login_url)
     driver.get(login_url)
 
-    # Give potential bot‑protection scripts a moment to render
-    time.sleep(2)
-
-    # Wait for the username field to appear
+    # Wait for the username field to appear (covers bot‑protection rendering too)
     try:
         WebDriverWait(driver, 15).until(
             EC.presence_of_element_located((By.ID, "username"))
@@ -64,89 +222,58 @@ def perform_cosmos_login(
         return {"error": "Login page did not load in time"}
 
     try:
-        # --- Locate credential inputs robustly --------------------------------
-        possible_email_selectors = [
-            (By.ID, "username"),
-            (By.NAME, "identifier"),
-            (By.NAME, "email"),
-            (By.CSS_SELECTOR, "input[type='email']"),
-            (By.CSS_SELECTOR, "input[placeholder*='Email']"),
-            (By.CSS_SELECTOR, "input[autocomplete='username']"),
-        ]
-
-        possible_pwd_selectors = [
-            (By.ID, "password"),
-            (By.NAME, "password"),
-            (By.CSS_SELECTOR, "input[type='password']"),
-            (By.CSS_SELECTOR, "input[autocomplete='current-password']"),
-        ]
-
-        email_input = None
-        for by, sel in possible_email_selectors:
-            try:
-                email_input = driver.find_element(by, sel)
-                break
-            except NoSuchElementException:
-                continue
-
-        pwd_input = None
-        for by, sel in possible_pwd_selectors:
-            try:
-                pwd_input = driver.find_element(by, sel)
-                break
-            except NoSuchElementException:
-                continue
+        # --- Locate credential inputs robustly (one round trip) ------------
+        email_input, pwd_input = driver.execute_script(_LOGIN_INPUTS_JS)
 
         if not email_input or not pwd_input:
             return {"error": "Login form inputs not found – selectors outdated."}
 
-        # Inputs may be covered by an overlay or marked readonly until focus.
-        for field, value in ((email_input, username), (pwd_input, password)):
-            WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable(field)
-            )
-            field.click()
-            field.clear()
-            try:
-                field.send_keys(value)
-            except Exception:
-                # Fallback: inject value via JS if element is temporarily read‑only
-                driver.execute_script(
-                    "arguments[0].removeAttribute('readonly');"
-                    "arguments[0].value = arguments[1];"
-                    "arguments[0].dispatchEvent(new Event('input',{bubbles:true}));",
-                    field, value,
+        # Both fields in one round trip; if the page rejects the scripted
+        # values, fall back to typing them field by field.
+        try:
+            filled = driver.execute_script(
+                _FILL_CREDENTIALS_JS, email_input, pwd_input, username, password)
+        except Exception as exc:
+            logger.debug("Scripted credential fill failed: %s", exc)
+            filled = False
+
+        if not filled:
+            # Inputs may be covered by an overlay or marked readonly until focus.
+            for field, value in ((email_input, username), (pwd_input, password)):
+                WebDriverWait(driver, 5).until(
+                    EC.element_to_be_clickable(field)
                 )
+                field.click()
+                field.clear()
+                try:
+                    field.send_keys(value)
+                except Exception:
+                    # Fallback: inject value via JS if element is temporarily read‑only
+                    driver.execute_script(
+                        "arguments[0].removeAttribute('readonly');"
+                        "arguments[0].value = arguments[1];"
+                        "arguments[0].dispatchEvent(new Event('input',{bubbles:true}));",
+                        field, value,
+                    )
         logger.debug("Credentials filled for '%s'.", username)
 
         # First, try submitting with ENTER key (more reliable on Cosmos)
-        from selenium.webdriver.common.keys import Keys
-        time.sleep(0.3)
         pwd_input.send_keys(Keys.RETURN)
-        time.sleep(1)
-
-        # If still on /login, fallback to clicking the button (if visible)
-        if "login" in driver.current_url.lower():
-            possible_login_btn_selectors = [
-                (By.CSS_SELECTOR, "[data-testid='Login_SignInBtn']"),
-                (By.CSS_SELECTOR, "button[type='submit']"),
-                (By.XPATH,
-                 "//button[contains(translate(., 'ENTER', 'enter'), 'enter')]"),
-            ]
-            for by, sel in possible_login_btn_selectors:
-                try:
-                    login_btn = driver.find_element(by, sel)
-                    login_btn.click()
-                    break
-                except NoSuchElementException:
-                    continue
+
+        # If still on /login shortly after, fallback to clicking the button
+        try:
+            WebDriverWait(driver, 3, poll_frequency=_REDIRECT_POLL_SEC).until_not(
+                _on_login_page)
+        except TimeoutException:
+            login_btn = driver.execute_script(_LOGIN_BTN_JS)
+            if login_btn:
+                login_btn.click()
 
         logger.debug("Login form submitted, waiting for redirect…")
 
         # Successful login ⇒ URL no longer contains /login
-        WebDriverWait(driver, 20).until(
-            lambda d: "login" not in d.current_url.lower()
-        )
+        WebDriverWait(driver, 20, poll_frequency=_REDIRECT_POLL_SEC).until_not(
+            _on_login_page)
     except Exception as exc:
         return {"error": f"Failed to submit login form: {exc}"}
 
@@ -173,41 +300,152 @@ class CosmosDriver:
         *,
         login_url: str = f"{STATE_PATH_COSMOS_URL}/login",
         headless: bool = True,
+        profile_dir: str | None = settings.COSMOS_PROFILE_DIR,
+        state_path: str = STATE_PATH_COSMOS,
     ):
+        self._state_path = state_path
+        self._login_url = login_url
+        self._username = username
+        self._password = password
+        self._headless = headless
+        self._profile_dir = profile_dir
+        # Chrome is started on first `browser` access (see start())
+        self._browser: webdriver.Chrome | None = None
+        self._ready = False
+        self._start_lock = threading.Lock()
+        # Plain-HTTP session for parse_media_fast (created on first use)
+        self._http: requests.Session | None = None
+
+    @property
+    def browser(self) -> webdriver.Chrome:
+        """The WebDriver, with Chrome started and the session established."""
+        if not self._ready:
+            self.start()
+        return self._browser
+
+    def start(self) -> "CosmosDriver":
+        """
+        Start Chrome and establish the Cosmos session (no-op once started).
+
+        Called implicitly by the first `browser` access, so importing or
+        constructing the driver costs nothing until something is scraped.
+        Raises RuntimeError if the login fails; a later call retries.
+        """
+        with self._start_lock:
+            if not self._ready:
+                self._ensure_session()
+                self._ready = True
+        return self
+
+    def _ensure_session(self) -> None:
+        if settings.SHARE_CHROME:
+            # Own tab in the shared Chrome process (flags are set at its launch)
+            browser = shared_chrome.attach_driver(
+                page_load_strategy=PAGE_LOAD_STRATEGY)
+        else:
+            browser = self._launch_chrome(self._headless, self._profile_dir)
+        browser.set_page_load_timeout(30)
+        # No implicit wait: missed selectors in the login probes and the DOM
+        # walk must fail fast; required elements use an explicit WebDriverWait.
+        browser.implicitly_wait(0)
+
+        logger.info("Chrome WebDriver started (headless=%s).", self._headless)
+
+        # Session helpers below use `_browser` directly; other threads see
+        # the driver through `browser` only once `_ready` is set
+        self._browser = browser
+        try:
+            # Login/session restore needs no media, fonts or trackers
+            self._set_blocked_urls(_LOGIN_BLOCKED_URLS)
+
+            # Try restoring previous session first
+            if self._load_cookies():
+                logger.info("Existing Cosmos session restored from cookies.")
+            else:
+                logger.info("No valid session cookies – performing fresh login…")
+                result = perform_cosmos_login(
+                    browser, self._login_url, self._username, self._password)
+                if "error" in result:
+                    raise RuntimeError(f"Cosmos login failed: {result['error']}")
+
+                # Persist cookies for future runs
+                self._save_cookies()
+
+            # Scanning phase: keep media blocked only if configured
+            self._set_blocked_urls(
+                _BLOCKED_MEDIA_URLS if settings.COSMOS_BLOCK_IMAGES else ())
+        except BaseException:
+            self._browser = None
+            browser.quit()
+            raise
+
+    @staticmethod
+    def _launch_chrome(
+        headless: bool, profile_dir: str | None = None
+    ) -> webdriver.Chrome:
+        """
+        Start a dedicated Chrome instance for Cosmos.
+
+        With `profile_dir` Chrome keeps its profile (HTTP cache, cookies)
+        there between restarts, so cosmos.so static assets are not
+        re-downloaded on every boot. A profile dir can be used by one
+        Chrome process at a time.
+        """
         # --- Selenium options ------------------------------------------------
         chrome_opts = Options()
+        chrome_opts.page_load_strategy = PAGE_LOAD_STRATEGY
         chrome_opts.add_argument(
             "--disable-blink-features=AutomationControlled")
         if headless:
-            chrome_opts.add_argument("--headless")
+            chrome_opts.add_argument("--headless=new")
             chrome_opts.add_argument("--window-size=1280,900")
+        # Trim long-lived headless sessions: no GPU/extension helpers, no
+        # background networking or throttled/backgrounded renderers, capped V8 heap
+        for flag in (
+            "--disable-gpu",
+            "--disable-software-rasterizer",
+            "--disable-extensions",
+            "--disable-background-networking",
+            "--disable-component-update",
+            "--disable-sync",
+            "--mute-audio",
+            "--disable-background-timer-throttling",
+            "--disable-renderer-backgrounding",
+            "--js-flags=--max-old-space-size=512",
+        ):
+            chrome_opts.add_argument(flag)
+        # One --disable-features switch: Chrome only honours the last one given
         chrome_opts.add_argument(
-            "--disable-features=BlockInsecurePrivateNetworkRequests")
+            "--disable-features=BlockInsecurePrivateNetworkRequests,Translate")
         chrome_opts.add_argument("--remote-allow-origins=*")
         chrome_opts.add_argument("--no-sandbox")
-        chrome_opts.add_argument("--disable-dev-shm-usage")
+        if _dev_shm_too_small():
+            chrome_opts.add_argument("--disable-dev-shm-usage")
         chrome_opts.add_argument("--disable-notifications")
         chrome_opts.add_argument(f"--user-agent={USER_AGENT}")
-
-        self.browser: webdriver.Chrome = webdriver.Chrome(options=chrome_opts)
-        self.browser.set_page_load_timeout(30)
-        self.browser.implicitly_wait(5)
-
-        logger.info("Chrome WebDriver started (headless=%s).", headless)
-
-        # Try restoring previous session first
-        if self._load_cookies():
-            logger.info("Existing Cosmos session restored from cookies.")
-        else:
-            logger.info("No valid session cookies – performing fresh login…")
-            result = perform_cosmos_login(
-                self.browser, login_url, username, password)
-            if "error" in result:
-                self.browser.quit()
-                raise RuntimeError(f"Cosmos login failed: {result['error']}")
-
-            # Persist cookies for future runs
-            self._save_cookies()
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+            chrome_opts.add_argument(f"--user-data-dir={profile_dir}")
+            chrome_opts.add_argument(
+                f"--disk-cache-dir={os.path.join(profile_dir, 'cache')}")
+
+        # Reuse one HTTP connection to chromedriver for every command
+        # (Selenium's default, pinned here so it cannot silently change)
+        return webdriver.Chrome(options=chrome_opts, keep_alive=True)
+
+    def _set_blocked_urls(self, patterns) -> None:
+        """
+        Replace the CDP list of URL patterns Chrome must not fetch (empty
+        tuple unblocks everything). Blocked images keep their `src` in the
+        DOM, so parsing is unaffected; bandwidth and renderer memory drop.
+        """
+        try:
+            self._browser.execute_cdp_cmd("Network.enable", {})
+            self._browser.execute_cdp_cmd(
+                "Network.setBlockedURLs", {"urls": list(patterns)})
+            logger.debug("Blocked URL patterns: %s", patterns or "none")
+        except Exception as exc:
+            logger.warning("Could not set blocked URLs: %s", exc)
 
     # --------------------------------------------------------------------- #
     # Cookie management helpers
@@ -215,93 +453,485 @@ class CosmosDriver:
     def _load_cookies(self) -> bool:
         """Return True if cookies were loaded and session is valid."""
         try:
-            if not os.path.exists(STATE_PATH_COSMOS):
-                logger.debug("Cookie file not found: %s", STATE_PATH_COSMOS)
+            if not os.path.exists(self._state_path):
+                logger.debug("Cookie file not found: %s", self._state_path)
                 return False
 
-            self.browser.get(STATE_PATH_COSMOS_URL)
-            with open(STATE_PATH_COSMOS, "rb") as fh:
-                cookies = pickle.load(fh)
+            cookies = cookie_store.load_cookies(self._state_path)
 
-            for ck in cookies:
-                ck.pop("sameSite", None)
-                ck.pop("priority", None)
-                try:
-                    self.browser.add_cookie(ck)
-                except Exception:
-                    continue
-
-            self.browser.refresh()
+            # Whole jar in one CDP call, before any page loads — so the first
+            # navigation already carries the session
+            try:
+                self._browser.execute_cdp_cmd(
+                    "Network.setCookies",
+                    {"cookies": [_cdp_cookie(ck) for ck in cookies]},
+                )
+                via_cdp = True
+            except Exception as exc:
+                logger.debug("Network.setCookies failed (%s), using add_cookie.", exc)
+                via_cdp = False
+            if not via_cdp:
+                # add_cookie only works on the cookie's own domain
+                self._browser.get(STATE_PATH_COSMOS_URL)
+                for ck in cookies:
+                    ck.pop("sameSite", None)
+                    ck.pop("priority", None)
+                    try:
+                        self._browser.add_cookie(ck)
+                    except Exception:
+                        continue
+
+            # Stricter and cheaper check when configured: one credentialed
+            # fetch to an auth-gated API endpoint instead of loading the app
+            if settings.COSMOS_AUTH_CHECK_URL:
+                if via_cdp:
+                    self._browser.get(_AUTH_PROBE_ORIGIN_URL)
+                status = self._auth_status(settings.COSMOS_AUTH_CHECK_URL)
+                logger.debug("Auth probe %s → HTTP %s",
+                             settings.COSMOS_AUTH_CHECK_URL, status)
+                return 200 <= status < 300
+
+            # One navigation to an auth-gated page: it both applies the
+            # session and serves as the probe (logged-out users land on /login)
+            self._browser.get(_SESSION_PROBE_URL)
             return self._is_logged_in()
 
         except Exception as exc:
             logger.warning("Error while loading cookies: %s", exc)
             return False
 
+    def _auth_status(self, url: str) -> int:
+        """HTTP status of a credentialed fetch of `url` from the current page."""
+        reply = self._browser.execute_cdp_cmd("Runtime.evaluate", {
+            "expression": _AUTH_PROBE_EXPR % json.dumps(url),
+            "awaitPromise": True,
+            "returnByValue": True,
+        })
+        return int(reply["result"].get("value") or 0)
+
     def _save_cookies(self) -> None:
         """Persist current session cookies to disk."""
         try:
-            os.makedirs(os.path.dirname(STATE_PATH_COSMOS), exist_ok=True)
-            with open(STATE_PATH_COSMOS, "wb") as fh:
-                pickle.dump(self.browser.get_cookies(), fh)
-            logger.debug("Cookies saved to %s", STATE_PATH_COSMOS)
+            cookie_store.save_cookies(self._state_path, self._browser.get_cookies())
+            logger.debug("Cookies saved to %s", self._state_path)
         except Exception as exc:
             logger.error("Failed to save cookies: %s", exc)
 
     def _is_logged_in(self) -> bool:
         """Detects authenticated state by absence of '/login' in URL."""
-        return "login" not in self.browser.current_url.lower()
+        return "login" not in self._browser.current_url.lower()
 
     # --------------------------------------------------------------------- #
     # Business helpers
     # --------------------------------------------------------------------- #
+    def iter_media(self) -> Iterator[str]:
+        """
+        Yield image URLs from the Cosmos discover feed.
+
+        Srcs come from the page in chunks of `_MEDIA_PAGE_SIZE`, so a
+        consumer that streams them on never holds the whole feed.
+        """
+        self.browser.get(f"{STATE_PATH_COSMOS_URL}/discover")
+        try:
+            WebDriverWait(self.browser, 10).until(
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, settings.COSMOS_THUMB_SELECTOR))
+            )
+        except TimeoutException:
+            logger.warning("Discover feed rendered no images within 10 s.")
+
+        # A page of thumbnail srcs per round trip instead of get_attribute per <img>
+        offset, total, more = 0, 0, True
+        while more:
+            srcs, more = self.browser.execute_script(
+                _THUMB_SRCS_JS, settings.COSMOS_THUMB_SELECTOR,
+                offset, _MEDIA_PAGE_SIZE)
+            offset += _MEDIA_PAGE_SIZE
+            total += len(srcs)
+            yield from srcs
+        logger.info("Collected %d media items from discover.", total)
+
     def parse_media(self) -> List[str]:
         """Collect image URLs from the Cosmos discover feed."""
-        self.browser.get(f"{STATE_PATH_COSMOS_URL}/discover")
-        time.sleep(3)
+        return list(self.iter_media())
+
+    def parse_media_fast(self) -> List[str]:
+        """
+        Collect discover-feed image URLs over plain HTTP.
+
+        The browser's cookies are copied into a `requests.Session` and the
+        server-rendered HTML is scanned for <img src> — no rendering, no
+        image decoding. If the page ships no images (client-side rendered
+        feed, expired session), falls back to `parse_media()`.
+        """
+        if self._http is None:
+            self._http = requests.Session()
+            self._http.headers["User-Agent"] = USER_AGENT
+        # Cookies are re-read every call: the site may rotate them. The whole
+        # jar is read over CDP — get_cookies() only sees the current page,
+        # and a pooled driver is parked on about:blank
+        cookies = self.browser.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+        for ck in cookies:
+            domain = ck.get("domain", "").lstrip(".")
+            if not (_COSMOS_HOST == domain or _COSMOS_HOST.endswith("." + domain)):
+                continue
+            self._http.cookies.set(
+                ck["name"], ck["value"], domain=ck.get("domain"), path=ck.get("path", "/"))
 
-        urls: List[str] = []
-        for img in self.browser.find_elements(By.TAG_NAME, "img"):
-            src = img.get_attribute("src")
-            if src:
-                urls.append(src)
-        logger.info("Collected %d media items from discover.", len(urls))
-        return urls
+        try:
+            resp = self._http.get(f"{STATE_PATH_COSMOS_URL}/discover", timeout=15)
+            resp.raise_for_status()
+        except requests.RequestException as exc:
+            logger.warning("HTTP fetch of discover failed (%s); using the browser.", exc)
+            return self.parse_media()
+
+        collector = _ImgSrcCollector()
+        collector.feed(resp.text)
+        if not collector.srcs:
+            logger.info("Discover HTML has no <img>; using the browser.")
+            return self.parse_media()
+
+        logger.info("Collected %d media items from discover (HTTP).", len(collector.srcs))
+        return collector.srcs
 
     # --------------------------------------------------------------------- #
     # Cleanup
     # --------------------------------------------------------------------- #
     def close(self) -> None:
         """Terminate the WebDriver."""
-        try:
-            self.browser.quit()
-        except Exception:
-            pass
+        global _instance
+        with self._start_lock:
+            browser, self._browser, self._ready = self._browser, None, False
+        if browser is not None:
+            try:
+                browser.quit()
+            except Exception:
+                pass
+        if self._http is not None:
+            self._http.close()
+        with _instance_lock:
+            if _instance is self:
+                _instance = None
 
         logger.info("Chrome WebDriver closed.")
 
+    # WebDriver-compatible name: app shutdown calls `quit()` on every driver
+    quit = close
+
 
 # --------------------------------------------------------------------------- #
 # Public helper — mirrors `init_savee_driver` pattern                         #
 # --------------------------------------------------------------------------- #
-def init_cosmos_driver(*, headless: bool = True) -> CosmosDriver:
+_instance: "CosmosDriver | None" = None
+_instance_lock = threading.Lock()
+
+
+def init_cosmos_driver(*, headless: bool = True, start: bool = True) -> CosmosDriver:
     """
     Convenience wrapper used by FastAPI startup code.
 
-    Reads credentials from `like_scanner.config.settings` and returns an
-    initialized `CosmosDriver` instance (with cookies restored or with a fresh
-    login if necessary).
+    Reads credentials from `like_scanner.config.settings` and returns the
+    process-wide `CosmosDriver` (cookies restored or fresh login), starting
+    Chrome only on the first call; later calls reuse it until it is closed.
+    `headless` only applies to that first start. With `start=False` Chrome
+    is left for the first `browser` access — FastAPI calls this from a
+    threadpool and wants login errors raised here, hence the default.
+    """
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = CosmosDriver(
+                username=settings.COSMOS_EMAIL,
+                password=settings.COSMOS_PASSWORD,
+                headless=headless,
+            )
+        driver = _instance
+    return driver.start() if start else driver
+
+
+@atexit.register
+def _close_instance() -> None:
+    """Quit the shared driver if the process exits without app shutdown."""
+    if _instance is not None:
+        _instance.close()
+
+
+# --------------------------------------------------------------------------- #
+# Pool of logged-in drivers                                                   #
+# --------------------------------------------------------------------------- #
+class CosmosDriverPool:
     """
-    return CosmosDriver(
-        username=settings.COSMOS_EMAIL,
-        password=settings.COSMOS_PASSWORD,
-        headless=headless,
-    )
+    Bounded pool of logged-in `CosmosDriver` instances.
+
+    Drivers are started lazily (up to `size`) and handed out with
+    `lease()`; a returned driver is parked on about:blank and reused, so
+    Chrome start-up and login are paid once per slot rather than per scan.
+    After `max_uses` leases a driver is closed and a fresh one started
+    on demand — this caps Chromium's memory creep in long-lived sessions.
+
+    With `COSMOS_PROFILE_DIR` set, every slot gets its own sub-directory:
+    Chrome cannot share one profile between processes.
+    """
+
+    def __init__(self, size: int = 4, max_uses: int = 50, *, headless: bool = True):
+        self._size = size
+        self._max_uses = max_uses
+        self._headless = headless
+        self._idle: List[CosmosDriver] = []
+        self._uses: Dict[int, int] = {}
+        self._slots: Dict[int, int] = {}
+        self._free_slots = list(range(size - 1, -1, -1))
+        # Guards _idle/_free_slots; notified whenever either one grows
+        self._cond = threading.Condition()
+
+    def _start(self, slot: int) -> CosmosDriver:
+        profile_dir = settings.COSMOS_PROFILE_DIR
+        if profile_dir:
+            profile_dir = os.path.join(profile_dir, f"slot{slot}")
+        driver = CosmosDriver(
+            username=settings.COSMOS_EMAIL,
+            password=settings.COSMOS_PASSWORD,
+            headless=self._headless,
+            profile_dir=profile_dir,
+        ).start()
+        self._uses[id(driver)] = 0
+        self._slots[id(driver)] = slot
+        logger.info("Cosmos pool: driver started in slot %d.", slot)
+        return driver
+
+    def acquire(self) -> CosmosDriver:
+        """Take an idle driver, start a new one if below `size`, or wait."""
+        with self._cond:
+            while not self._idle and not self._free_slots:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            slot = self._free_slots.pop()
+        try:
+            return self._start(slot)
+        except Exception:
+            with self._cond:
+                self._free_slots.append(slot)
+                self._cond.notify()
+            raise
+
+    def release(self, driver: CosmosDriver) -> None:
+        """Return a driver to the pool, recycling it after `max_uses` leases."""
+        key = id(driver)
+        self._uses[key] += 1
+        if self._uses[key] < self._max_uses:
+            try:
+                driver.browser.get("about:blank")
+                with self._cond:
+                    self._idle.append(driver)
+                    self._cond.notify()
+                return
+            except Exception as exc:
+                logger.warning("Cosmos pool: dropping broken driver: %s", exc)
+        self._discard(driver)
+
+    def _discard(self, driver: CosmosDriver) -> None:
+        key = id(driver)
+        del self._uses[key]
+        slot = self._slots.pop(key)
+        driver.close()
+        # A freed slot wakes a waiter too: it can start a fresh driver
+        with self._cond:
+            self._free_slots.append(slot)
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self) -> Iterator[CosmosDriver]:
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self) -> None:
+        """Close every idle driver (leased ones are closed on release)."""
+        self._max_uses = 0
+        while True:
+            with self._cond:
+                if not self._idle:
+                    break
+                driver = self._idle.pop()
+            self._discard(driver)
+
+
+# --------------------------------------------------------------------------- #
+# Several accounts in parallel                                                #
+# --------------------------------------------------------------------------- #
+def parse_media_bulk(
+    credentials: List[Tuple[str, str]], *, max_workers: int = 4
+) -> Dict[str, List[str]]:
+    """
+    Collect discover-feed media for several Cosmos accounts concurrently.
+
+    Each account gets its own Chrome (no shared profile dir) and its own
+    cookie file next to `STATE_PATH_COSMOS`, so sessions never mix. The
+    work is browser I/O, so threads run it in parallel. Returns
+    `{username: urls}`; an account that fails to log in maps to `[]`.
+    """
+    def scrape(username: str, password: str) -> List[str]:
+        safe_name = re.sub(r"[^\w.@-]", "_", username)
+        driver = CosmosDriver(
+            username,
+            password,
+            profile_dir=None,
+            state_path=f"{STATE_PATH_COSMOS}.{safe_name}",
+        )
+        try:
+            return driver.parse_media()
+        finally:
+            driver.close()
+
+    results: Dict[str, List[str]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(scrape, u, p): u for u, p in credentials}
+        for future, username in futures.items():
+            try:
+                results[username] = future.result()
+            except Exception as exc:
+                logger.error("Cosmos bulk scrape failed for %s: %s", username, exc)
+                results[username] = []
+    return results
 
 
 # --------------------------------------------------------------------------- #
 # Parser function for Cosmos images                                           #
 # --------------------------------------------------------------------------- #
+# Шаблоны вида "X connections", "X saves", "connection(X)" для поиска по
+# HTML всей страницы; первый сработавший шаблон выигрывает
+_PAGE_COUNT_JS = r"""
+var html = document.documentElement.outerHTML;
+var patterns = [
+    /(\d+)\s*connections/i,
+    /(\d+)\s*saves/i,
+    /connection\D*(\d+)/i,
+    /connections\D*(\d+)/i
+];
+for (var i = 0; i < patterns.length; i++) {
+    var m = html.match(patterns[i]);
+    if (m) return {count: m[1], pattern: patterns[i].source};
+}
+return null;
+"""
+
+_DIGIT_RE = re.compile(r'\d+')
+
+_DEBUG_SCREENSHOT_PATH = "/tmp/cosmos_debug.png"
+
+# driver → ((profile_url, высота страницы, число <img>), список URL картинок)
+_SRCS_CACHE: "weakref.WeakKeyDictionary[Any, tuple]" = weakref.WeakKeyDictionary()
+
+_FEED_STATE_JS = (
+    "return [document.body.scrollHeight, document.getElementsByTagName('img').length];"
+)
+
+
+def _feed_grew(page_height: int):
+    """Условие WebDriverWait: [высота, число <img>], когда лента выросла."""
+    def check(driver):
+        state = driver.execute_script(_FEED_STATE_JS)
+        return state if state[0] > page_height else False
+    return check
+
+
+# Весь сбор данных со страницы — один execute_script вместо десятков
+# WebDriver-запросов на каждую картинку (get_attribute, rect, атрибуты…).
+# arguments[0] — индекс карточки; для неё дополнительно возвращаются сам
+# элемент, позиция, числовые data-* атрибуты, видимый текст страницы и
+# число из обхода предков (CSS/DOM вместо XPath-запросов).
+# arguments[1] — нужен ли список URL (false, если он уже есть в кэше).
+_SCRAPE_JS = """
+var EXT = /\\.(webp|jpg|jpeg|png|gif)$/i;
+var imgs = [];
+document.querySelectorAll('img').forEach(function (el) {
+    if (el.src && EXT.test(el.src)) imgs.push(el);
+});
+var out = {
+    srcs: arguments[1] ? imgs.map(function (el) { return el.src; }) : null,
+    count: imgs.length,
+    ends: imgs.length ? [imgs[0].src, imgs[imgs.length - 1].src] : [],
+    target: null
+};
+var el = imgs[arguments[0]];
+if (!el) return out;
+
+out.target = el;
+var rect = el.getBoundingClientRect();
+out.x = rect.x;
+out.y = rect.y;
+
+var attrs = {};
+for (var i = 0; i < el.attributes.length; i++) {
+    var attr = el.attributes[i];
+    if (attr.name.startsWith('data-') && !isNaN(parseInt(attr.value))) {
+        attrs[attr.name] = attr.value;
+    }
+}
+out.dataAttrs = attrs;
+
+var texts = [];
+var walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT, null, false);
+var node;
+while (node = walker.nextNode()) {
+    var text = node.textContent.trim();
+    if (text && node.parentElement.offsetParent !== null) {
+        var r = node.parentElement.getBoundingClientRect();
+        if (r.width > 0 && r.height > 0) {
+            texts.push({text: text, x: r.x, y: r.y, width: r.width, height: r.height});
+        }
+    }
+}
+out.texts = texts;
+
+// Счётчик рядом с картинкой: поднимаемся по предкам (до 8 уровней) и
+// берём первое число из подходящих span/div — по правилам в порядке приоритета
+function ownText(e) {
+    var t = '';
+    for (var c = e.firstChild; c; c = c.nextSibling) {
+        if (c.nodeType === 3) t += c.nodeValue;
+    }
+    return t;
+}
+function hasConnection(e) { return ownText(e).indexOf('connection') >= 0; }
+function isShort(e) {
+    var t = ownText(e);
+    return t && t.indexOf(' ') < 0 && e.textContent.trim().length <= 5;
+}
+var RULES = [
+    ['span', hasConnection],
+    ['div', hasConnection],
+    ['span', isShort],
+    ['div', isShort],
+    ['span[class*="connection"]', null],
+    ['div[class*="connection"]', null],
+    ['span[class*="count"]', null],
+    ['div[class*="count"]', null]
+];
+out.domCount = null;
+var cur = el;
+search:
+for (var level = 0; level < 8 && cur; level++) {
+    for (var k = 0; k < RULES.length; k++) {
+        var found = cur.querySelectorAll(RULES[k][0]);
+        for (var j = 0; j < found.length; j++) {
+            if (RULES[k][1] && !RULES[k][1](found[j])) continue;
+            var m = (found[j].innerText || '').match(/\\d+/);
+            if (m) {
+                out.domCount = {count: parseInt(m[0], 10), rule: RULES[k][0]};
+                break search;
+            }
+        }
+    }
+    cur = cur.parentElement;
+}
+return out;
+"""
+
+
 def parse_cosmos_profile(driver, profile_url, start_index) -> dict:
     """
     Парсит страницу профиля Cosmos и возвращает информацию о новом элементе.
@@ -324,7 +954,7 @@ def parse_cosmos_profile(driver, profile_url, start_index) -> dict:
     start_index = max(0, start_index)
 
     logger.info(
-        f"Запуск парсинга профиля Cosmos: {profile_url}, start_index={start_index}")
+        "Запуск парсинга профиля Cosmos: %s, start_index=%s", profile_url, start_index)
 
     # Добавляем диагностическую информацию
     logger.info("ДИАГНОСТИКА: Начало парсинга Cosmos с индекса %s", start_index)
@@ -350,11 +980,17 @@ def parse_cosmos_profile(driver, profile_url, start_index) -> dict:
     if not current_url.startswith(profile_url):
         try:
             driver.get(profile_url)
-            logger.info(f"Открыта страница профиля: {profile_url}")
-            # Даем время на загрузку страницы
-            time.sleep(3)
+            logger.info("Открыта страница профиля: %s", profile_url)
+            # Ждём первую картинку ленты, а не фиксированные 3 секунды
+            try:
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.TAG_NAME, "img"))
+                )
+            except TimeoutException:
+                logger.warning(
+                    "Лента профиля не отрисовала изображения за 10 с: %s", profile_url)
         except Exception as e:
-            logger.error(f"Ошибка при открытии профиля {profile_url}: {e}")
+            logger.error("Ошибка при открытии профиля %s: %s", profile_url, e)
             result["error"] = f"Не удалось открыть профиль: {e}"
             return result
     else:
@@ -365,143 +1001,92 @@ def parse_cosmos_profile(driver, profile_url, start_index) -> dict:
     max_scrolls = 5
     scrolls_done = 0
 
-    # Собираем все изображения на странице
-    image_elements = driver.find_elements(By.TAG_NAME, "img")
-    image_count = len(image_elements)
+    # Состояние ленты — два числа (высота страницы, число <img>), а не
+    # сериализованный список всех элементов после каждой прокрутки
+    page_height, image_count = driver.execute_script(_FEED_STATE_JS)
 
     # Если изображений меньше, чем start_index, нужно скроллить
     while image_count <= start_index and scrolls_done < max_scrolls:
         try:
             driver.execute_script(
                 "window.scrollTo(0, document.body.scrollHeight);")
-            logger.info(f"Выполнена прокрутка #{scrolls_done + 1}")
-            time.sleep(settings.SCROLL_DELAY_SEC or 2)
+            logger.info("Выполнена прокрутка #%s", scrolls_done + 1)
 
-            # Обновляем список изображений
-            image_elements = driver.find_elements(By.TAG_NAME, "img")
-            new_count = len(image_elements)
-
-            if new_count > image_count:
-                image_count = new_count
-            else:
-                # Если количество изображений не увеличилось, возможно, мы достигли конца страницы
-                logger.info(
-                    "Количество изображений не увеличилось после прокрутки")
+            # Ждём, пока ленивая загрузка дорисует ленту: выходим сразу, как
+            # страница выросла; SCROLL_DELAY_SEC — лишь верхняя граница
+            try:
+                page_height, image_count = WebDriverWait(
+                    driver, settings.SCROLL_DELAY_SEC or 2, poll_frequency=0.1
+                ).until(_feed_grew(page_height))
+            except TimeoutException:
+                # Страница не выросла после прокрутки — достигнут конец ленты
+                logger.info("Высота страницы не увеличилась после прокрутки")
                 break
 
             scrolls_done += 1
         except Exception as e:
-            logger.warning(f"Ошибка при скроллинге: {e}")
+            logger.warning("Ошибка при скроллинге: %s", e)
             break
 
-    # Получаем список всех валидных изображений
-    image_urls = []
-    for img in image_elements:
-        src = img.get_attribute("src")
-        if src and src.lower().endswith((".webp", ".jpg", ".jpeg", ".png", ".gif")):
-            image_urls.append(src)
-
-    logger.info(f"Найдено {len(image_urls)} изображений с валидными URL")
-
-    # Обработка изображений начиная с start_index
-    processed = 0
-    for idx, url in enumerate(image_urls):
-        if idx < start_index:
-            processed += 1
-            continue  # пропускаем до нужного индекса
-
-        image_url = url
+    # Одним execute_script: валидные URL изображений + всё, что нужно для
+    # карточки start_index (элемент, позиция, data-атрибуты, видимый текст).
+    # Пока лента та же (URL, высота, число <img>), список URL не пересылаем —
+    # берём из кэша, сверив число валидных картинок и первый/последний src:
+    # виртуализированная лента может сменить узлы при том же их числе
+    feed_sig = (profile_url, page_height, image_count)
+    cached = _SRCS_CACHE.get(driver)
+    reuse = cached is not None and cached[0] == feed_sig
+    scrape = driver.execute_script(_SCRAPE_JS, start_index, not reuse)
+    if (reuse and scrape["count"] == len(cached[1])
+            and scrape["ends"] == cached[1][:1] + cached[1][-1:]):
+        image_urls = cached[1]
+    else:
+        if scrape["srcs"] is None:
+            scrape = driver.execute_script(_SCRAPE_JS, start_index, True)
+        image_urls = scrape["srcs"]
+        _SRCS_CACHE[driver] = (feed_sig, image_urls)
+
+    logger.info("Найдено %s изображений с валидными URL", len(image_urls))
+
+    # Обработка изображения start_index: карточки до него считаются
+    # просмотренными, а нужный URL берём прямо по индексу, без прохода по списку
+    processed = min(start_index, len(image_urls))
+    if start_index < len(image_urls):
+        idx = start_index
+        image_url = image_urls[idx]
         logger.info(
-            f"Обрабатываем изображение по индексу {idx}: URL={image_url}")
+            "Обрабатываем изображение по индексу %s: URL=%s", idx, image_url)
 
         # Попытка найти количество "Connections" для текущего изображения
         connections_count = 0
         try:
-            # Делаем скриншот страницы для отладки (временно)
-            try:
-                screenshot_path = "/tmp/cosmos_debug.png"
-                driver.save_screenshot(screenshot_path)
-                logger.info(
-                    f"ДИАГНОСТИКА: Сохранен скриншот страницы в {screenshot_path}")
-            except Exception as e:
-                logger.warning(f"Не удалось сделать скриншот: {e}")
-
-            # Находим элемент с изображением
-            matching_img = None
-            for img in image_elements:
-                if img.get_attribute("src") == image_url:
-                    matching_img = img
-                    logger.info(
-                        "ДИАГНОСТИКА: Найдено совпадающее изображение в DOM")
-                    break
+            # Элемент изображения вернул тот же скрипт — повторный поиск не нужен
+            matching_img = scrape["target"]
 
             if matching_img:
                 try:
-                    # Получаем позицию изображения
-                    img_rect = driver.execute_script(
-                        "return arguments[0].getBoundingClientRect();", matching_img)
-                    img_x = img_rect['x']
-                    img_y = img_rect['y']
+                    # Позиция изображения
+                    img_x = scrape["x"]
+                    img_y = scrape["y"]
 
                     logger.info(
-                        f"ДИАГНОСТИКА: Позиция изображения: x={img_x}, y={img_y}")
+                        "ДИАГНОСТИКА: Позиция изображения: x=%s, y=%s", img_x, img_y)
 
                     # Сначала проверяем атрибуты изображения для чисел
-                    data_attrs = driver.execute_script("""
-                        var attrs = {};
-                        var elem = arguments[0];
-                        for (var i = 0; i < elem.attributes.length; i++) {
-                            var attr = elem.attributes[i];
-                            if (attr.name.startsWith('data-') && !isNaN(parseInt(attr.value))) {
-                                attrs[attr.name] = attr.value;
-                            }
-                        }
-                        return attrs;
-                    """, matching_img)
-
-                    for attr_name, attr_value in data_attrs.items():
+                    for attr_name, attr_value in scrape["dataAttrs"].items():
                         if 'connection' in attr_name.lower() or 'count' in attr_name.lower():
                             try:
                                 connections_count = int(attr_value)
                                 logger.info(
-                                    f"ДИАГНОСТИКА: Найдено число connections в атрибуте {attr_name}: {connections_count}")
+                                    "ДИАГНОСТИКА: Найдено число connections в атрибуте %s: %s", attr_name, connections_count)
                                 break
                             except:
                                 pass
 
                     # Если не нашли в атрибутах, ищем в соседних элементах
                     if connections_count == 0:
-                        # Ищем текст, содержащий "connection" или числа рядом с изображением
-                        page_text = driver.execute_script("""
-                        function getAllVisibleText() {
-                            const walker = document.createTreeWalker(
-                                document.body, 
-                                NodeFilter.SHOW_TEXT,
-                                null, 
-                                false
-                            );
-                            
-                            let textNodes = [];
-                            let node;
-                            while(node = walker.nextNode()) {
-                                const text = node.textContent.trim();
-                                if (text && node.parentElement.offsetParent !== null) {
-                                    const rect = node.parentElement.getBoundingClientRect();
-                                    if (rect.width > 0 && rect.height > 0) {
-                                        textNodes.push({
-                                            text: text,
-                                            x: rect.x,
-                                            y: rect.y,
-                                            width: rect.width,
-                                            height: rect.height
-                                        });
-                                    }
-                                }
-                            }
-                            return textNodes;
-                        }
-                        return getAllVisibleText();
-                        """)
+                        # Видимый текст страницы с координатами (из того же скрипта)
+                        page_text = scrape["texts"]
 
                         # Ищем текст, содержащий "connection" или числа рядом с изображением
                         closest_number = None
@@ -512,19 +1097,18 @@ def parse_cosmos_profile(driver, profile_url, start_index) -> dict:
 
                             # Логируем все тексты для анализа
                             logger.info(
-                                f"ДИАГНОСТИКА: Найден текст на странице: '{text}'")
+                                "ДИАГНОСТИКА: Найден текст на странице: '%s'", text)
 
                             # Проверяем содержит ли текст слово "connection" и цифры
                             if "connection" in text.lower():
                                 logger.info(
-                                    f"ДИАГНОСТИКА: Найден текст содержащий 'connection': '{text}'")
+                                    "ДИАГНОСТИКА: Найден текст содержащий 'connection': '%s'", text)
                                 # Извлекаем числа из текста
-                                import re
-                                numbers = re.findall(r'\d+', text)
-                                if numbers:
-                                    connections_count = int(numbers[0])
+                                number = _DIGIT_RE.search(text)
+                                if number:
+                                    connections_count = int(number.group())
                                     logger.info(
-                                        f"ДИАГНОСТИКА: Извлечено число из текста с connections: {connections_count}")
+                                        "ДИАГНОСТИКА: Извлечено число из текста с connections: %s", connections_count)
                                     break
 
                             # Если текст просто число, проверяем расстояние до изображения
@@ -536,7 +1120,7 @@ def parse_cosmos_profile(driver, profile_url, start_index) -> dict:
                                             (img_y - text_y)**2)**0.5
 
                                 logger.info(
-                                    f"ДИАГНОСТИКА: Найдено число {text} на расстоянии {distance} пикселей от изображения")
+                                    "ДИАГНОСТИКА: Найдено число %s на расстоянии %s пикселей от изображения", text, distance)
 
                                 # Если это ближайшее к изображению число, запоминаем его
                                 if distance < min_distance and distance < 300:  # Максимальное расстояние 300px
@@ -547,88 +1131,47 @@ def parse_cosmos_profile(driver, profile_url, start_index) -> dict:
                         if closest_number is not None and connections_count == 0:
                             connections_count = closest_number
                             logger.info(
-                                f"ДИАГНОСТИКА: Используем ближайшее число как connections: {connections_count}")
+                                "ДИАГНОСТИКА: Используем ближайшее число как connections: %s", connections_count)
 
                 except Exception as e:
                     logger.warning(
-                        f"Ошибка при выполнении JavaScript для поиска текста: {e}")
-
-                # Поиск connections через DOM
-                if connections_count == 0:
-                    current_elem = matching_img
-                    parent_levels = [current_elem]
-
-                    # Проверяем родительские элементы до 8 уровней вверх
-                    for level in range(8):
-                        if not current_elem:
-                            break
-
-                        # Ищем элементы с текстом "connection" или просто числа
-                        for selector in [
-                            ".//span[contains(text(), 'connection')]",
-                            ".//div[contains(text(), 'connection')]",
-                            ".//span[text()[not(contains(., ' '))]][string-length(normalize-space()) <= 5]",
-                            ".//div[text()[not(contains(., ' '))]][string-length(normalize-space()) <= 5]",
-                            ".//span[contains(@class, 'connection')]",
-                            ".//div[contains(@class, 'connection')]",
-                            ".//span[contains(@class, 'count')]",
-                            ".//div[contains(@class, 'count')]"
-                        ]:
-                            elements = current_elem.find_elements(
-                                By.XPATH, selector)
-                            for elem in elements:
-                                text = elem.text.strip()
-                                logger.info(
-                                    f"ДИАГНОСТИКА: Найден элемент с селектором {selector}, текст: '{text}'")
-
-                                if text:
-                                    # Извлекаем числа из текста
-                                    import re
-                                    numbers = re.findall(r'\d+', text)
-                                    if numbers:
-                                        connections_count = int(numbers[0])
-                                        logger.info(
-                                            f"ДИАГНОСТИКА: Найдено {connections_count} connections через DOM")
-                                        break
-
-                            if connections_count > 0:
-                                break
+                        "Ошибка при разборе текста вокруг изображения: %s", e)
 
-                            # Переходим на уровень выше
-                            try:
-                                current_elem = current_elem.find_element(
-                                    By.XPATH, "./..")
-                            except:
-                                break
+                # Поиск connections через DOM: обход предков (до 8 уровней)
+                # уже выполнен в _SCRAPE_JS — здесь только его результат
+                if connections_count == 0 and scrape["domCount"]:
+                    connections_count = scrape["domCount"]["count"]
+                    logger.info(
+                        "ДИАГНОСТИКА: Найдено %s connections через DOM (%s)",
+                        connections_count, scrape["domCount"]["rule"])
 
             # Если все методы не сработали, попробуем найти число на всей странице
             if connections_count == 0:
                 try:
-                    # Получаем весь текст страницы и ищем в нем шаблоны connections
-                    page_source = driver.page_source.lower()
-                    import re
-
-                    # Ищем шаблоны вида "X connections", "X saves", "connection(X)"
-                    patterns = [
-                        r'(\d+)\s*connections',
-                        r'(\d+)\s*saves',
-                        r'connection\D*(\d+)',
-                        r'connections\D*(\d+)'
-                    ]
-
-                    for pattern in patterns:
-                        matches = re.findall(pattern, page_source)
-                        if matches:
-                            connections_count = int(matches[0])
-                            logger.info(
-                                f"ДИАГНОСТИКА: Найдено {connections_count} через regex в HTML: {pattern}")
-                            break
+                    # Шаблоны connections прогоняем по HTML прямо в странице:
+                    # обратно приходит только найденное число, а не весь DOM
+                    found = driver.execute_script(_PAGE_COUNT_JS)
+                    if found:
+                        connections_count = int(found["count"])
+                        logger.info(
+                            "ДИАГНОСТИКА: Найдено %s через regex в HTML: %s", connections_count, found["pattern"])
+                except Exception as e:
+                    logger.warning("Ошибка при поиске через regex: %s", e)
+
+            # Скриншот для отладки — только когда число так и не нашлось
+            # и он явно включён (COSMOS_DEBUG_SCREENSHOT=1); уровень логгера
+            # "cosmos" зафиксирован на INFO, поэтому решает только настройка
+            if connections_count == 0 and settings.COSMOS_DEBUG_SCREENSHOT:
+                try:
+                    driver.save_screenshot(_DEBUG_SCREENSHOT_PATH)
+                    logger.info(
+                        "ДИАГНОСТИКА: Сохранен скриншот страницы в %s", _DEBUG_SCREENSHOT_PATH)
                 except Exception as e:
-                    logger.warning(f"Ошибка при поиске через regex: {e}")
+                    logger.warning("Не удалось сделать скриншот: %s", e)
 
         except Exception as e:
             logger.warning(
-                f"Ошибка при извлечении количества connections: {e}")
+                "Ошибка при извлечении количества connections: %s", e)
 
         # Удаляем тестовые значения для чистоты тестирования
         # # Для отладки - имитация находок для тестирования
@@ -645,20 +1188,20 @@ def parse_cosmos_profile(driver, profile_url, start_index) -> dict:
         result["image_url"] = image_url
         result["saves"] = connections_count
         logger.info(
-            f"ДИАГНОСТИКА: Итоговое количество connections: {connections_count}")
+            "ДИАГНОСТИКА: Итоговое количество connections: %s", connections_count)
         processed += 1
         # Четко указываем, что следующий индекс должен быть увеличен
         result["next_index"] = start_index + processed
         logger.info(
-            f"Обработано изображение, новый индекс: {result['next_index']}")
+            "Обработано изображение, новый индекс: %s", result['next_index'])
         return result
 
-    # Если дошли до конца списка без обработки изображений
+    # Если start_index за концом списка — обрабатывать нечего
     if processed == 0:
         processed = 1  # хотя бы одну карточку «просмотрели»
     result["next_index"] = start_index + processed
     logger.info(
-        f"Новых элементов для указанного индекса не найдено. Просмотрено {processed} карточек. Новый индекс: {result['next_index']}")
+        "Новых элементов для указанного индекса не найдено. Просмотрено %s карточек. Новый индекс: %s", processed, result['next_index'])
     result["error"] = "Новые изображения отсутствуют"
     return result
 
@@ -681,8 +1224,6 @@ if __name__ == "__main__":
            Subsequent runs of Like‑Scanner will restore the session without
            interacting with the login form.
     """
-    from pathlib import Path
-
     chrome_opts = Options()
     chrome_opts.add_argument("--disable-blink-features=AutomationControlled")
     chrome_opts.add_argument("--remote-allow-origins=*")
@@ -696,9 +1237,7 @@ if __name__ == "__main__":
     input("\n>>> Завершите вход в браузере, затем нажмите ENTER, чтобы сохранить cookies… ")
 
     # Persist cookies
-    Path(os.path.dirname(STATE_PATH_COSMOS)).mkdir(parents=True, exist_ok=True)
-    with open(STATE_PATH_COSMOS, "wb") as fh:
-        pickle.dump(browser.get_cookies(), fh)
+    cookie_store.save_cookies(STATE_PATH_COSMOS, browser.get_cookies())
     print(f"✅ Cookies сохранены в {STATE_PATH_COSMOS}")
 
     browser.quit()
@@ -1,82 +1,152 @@
 import logging
-import pickle
 import tempfile
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Iterator
 
 from like_scanner.config import settings
+from like_scanner.infra.drivers import cookie_store, shared_chrome
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+# Значения настроек читаем один раз при импорте, а не на каждом вызове
+STATE_PATH_SAVEE: str | None = getattr(settings, "STATE_PATH_SAVEE", None)
+SAVEE_LOGIN_URL: str | None = getattr(settings, "STATE_PATH_SAVEE_URL", None)
+USER_AGENT: str | None = getattr(settings, "USER_AGENT", None)
 
 # Инициализация логгера для текущего модуля
 logger = logging.getLogger('like_scanner.infra.drivers.savee_driver')
 
+# Число карточек (<img> + <video>) в DOM — один запрос вместо двух find_elements
+_MEDIA_COUNT_JS = "return document.querySelectorAll('img,video').length;"
+
+# Все медиа страницы одним execute_script: [tagName, src, элемент] в том же
+# порядке, что и раньше (сначала все <img>, затем каждое <video> и его
+# <source>). Элемент возвращается только для <img> — для поиска сохранений.
+_MEDIA_SRCS_JS = """
+var out = [];
+document.querySelectorAll('img').forEach(function (el) { out.push(['IMG', el.src, el]); });
+document.querySelectorAll('video').forEach(function (v) {
+    out.push(['VIDEO', v.src, null]);
+    v.querySelectorAll('source').forEach(function (s) { out.push(['SOURCE', s.src, null]); });
+});
+return out;
+"""
+
+_IMAGE_EXTS = (".webp", ".jpg", ".jpeg", ".png")
+
+
+def _savee_cookies(cookies: list[dict]) -> list[dict]:
+    """Cookies домена Savee (или без домена) без мешающего add_cookie sameSite."""
+    return [
+        {k: v for k, v in c.items() if k != "sameSite"}
+        for c in cookies if "savee" in (c.get("domain") or "savee")
+    ]
+
+
+# Признаки неавторизованной сессии: /login в URL или «log in» в разметке.
+# Проверяется в браузере — обратно приходит один bool, а не весь page_source.
+_NEEDS_LOGIN_JS = """
+return location.href.toLowerCase().indexOf('login') >= 0
+    || document.documentElement.outerHTML.toLowerCase().indexOf('log in') >= 0;
+"""
+
+
+def _needs_login(driver) -> bool:
+    return bool(driver.execute_script(_NEEDS_LOGIN_JS))
+
+
+def _logged_in(driver) -> bool:
+    """Условие WebDriverWait: ушли со страницы /login и на ней есть картинки."""
+    return ("login" not in driver.current_url.lower()
+            and driver.execute_script("return document.images.length;") > 0)
+
+
+def _media_grew(count: int):
+    """Условие WebDriverWait: новое число карточек, когда их стало больше `count`."""
+    def check(driver):
+        current = driver.execute_script(_MEDIA_COUNT_JS)
+        return current if current > count else False
+    return check
+
+# Число сохранений рядом с карточкой: поднимаемся от arguments[0] до 8 уровней
+# вверх и на каждом берём первый <span>/<div>, чей текст — только цифры (0 — нет)
+_ANCESTOR_NUMBER_JS = """
+var el = arguments[0];
+for (var level = 0; level < 8 && el; level++) {
+    var nodes = el.querySelectorAll('span,div');
+    for (var i = 0; i < nodes.length; i++) {
+        var text = (nodes[i].innerText || '').trim();
+        if (/^\\d+$/.test(text)) return parseInt(text, 10);
+    }
+    el = el.parentElement;
+}
+return 0;
+"""
+
+# Крайняя мера поиска сохранений: первый в порядке документа элемент
+# страницы, чей видимый текст — одно число, в пределах 200 px от карточки
+# arguments[0]. Тексты, rect'ы и расстояния считаются в браузере; обратно —
+# [число, расстояние] или null.
+_NEARBY_NUMBER_JS = """
+var imgRect = arguments[0].getBoundingClientRect();
+var els = document.querySelectorAll('*');
+for (var i = 0; i < els.length; i++) {
+    var text = (els[i].innerText || '').trim();
+    if (!/^\\d+$/.test(text)) continue;
+    var r = els[i].getBoundingClientRect();
+    var distance = Math.hypot(imgRect.x - r.x, imgRect.y - r.y);
+    if (distance < 200) return [parseInt(text, 10), distance];
+}
+return null;
+"""
+
 
 def init_driver():
     """Инициализация Chrome WebDriver для Savee в headless-режиме с загрузкой cookies."""
     logger.info("Инициализация Selenium-драйвера для Savee в headless-режиме...")
-    # Настройка опций Chrome
-    options = Options()
-    options.headless = True  # запуск без интерфейса
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    # Создаём временный профиль пользователя
-    temp_profile_dir = tempfile.mkdtemp(prefix="savee_profile_")
-    options.add_argument(f"--user-data-dir={temp_profile_dir}")
-    logger.info(f"Создан временный профиль для Chrome: {temp_profile_dir}")
-    # Установка пользовательского агента из настроек
-    user_agent = getattr(settings, "USER_AGENT", None)
-    if user_agent:
-        options.add_argument(f"--user-agent={user_agent}")
-        logger.info(f"User-Agent установлен: {user_agent}")
+    if settings.SHARE_CHROME:
+        # Отдельная вкладка в общем процессе Chrome вместо своего браузера
+        try:
+            driver = shared_chrome.attach_driver()
+        except Exception as e:
+            logger.error("Ошибка подключения к общему Chrome: %s", e)
+            raise
     else:
-        logger.warning(
-            "USER_AGENT не указан в настройках, используется по умолчанию")
-    # Инициализация Chrome WebDriver
-    try:
-        driver = webdriver.Chrome(options=options)
-    except Exception as e:
-        logger.error(f"Ошибка запуска WebDriver: {e}")
-        raise  # пробрасываем исключение, т.к. драйвер критически не запустился
+        driver = _launch_chrome()
     logger.info("WebDriver успешно запущен.")
+    _block_third_party(driver)
     # Загрузка сохранённых cookies из файла
-    state_path = getattr(settings, "STATE_PATH_SAVEE", None)
+    state_path = STATE_PATH_SAVEE
     if state_path:
         try:
-            with open(state_path, "rb") as cookie_file:
-                cookies = pickle.load(cookie_file)
+            cookies = cookie_store.load_cookies(state_path)
             logger.info(
-                f"Загружено cookies из {state_path}: {len(cookies)} шт.")
+                "Загружено cookies из %s: %s шт.", state_path, len(cookies))
             # Переходим на базовый домен, чтобы установить cookies
             driver.get("https://savee.it")
-            for cookie in cookies:
-                # Убираем атрибуты, которые могут мешать добавлению cookie
-                cookie_data = cookie.copy()
-                cookie_domain = cookie_data.get("domain")
-                if cookie_domain and "savee" not in cookie_domain:
-                    # пропускаем cookie не для домена Savee
-                    continue
-                # удалить sameSite, если есть
-                cookie_data.pop("sameSite", None)
+            for cookie_data in _savee_cookies(cookies):
                 try:
                     driver.add_cookie(cookie_data)
                 except Exception as e:
                     logger.warning(
-                        f"Не удалось добавить cookie {cookie_data.get('name')}: {e}")
+                        "Не удалось добавить cookie %s: %s", cookie_data.get('name'), e)
             driver.refresh()  # Обновляем страницу, чтобы cookie вступили в силу
             logger.info("Cookies успешно добавлены в браузер.")
         except FileNotFoundError:
             logger.info(
-                f"Файл с cookies не найден по пути {state_path}. Пропускаем загрузку cookies.")
+                "Файл с cookies не найден по пути %s. Пропускаем загрузку cookies.", state_path)
         except Exception as e:
-            logger.error(f"Ошибка при загрузке cookies: {e}")
+            logger.error("Ошибка при загрузке cookies: %s", e)
     else:
         logger.warning(
             "STATE_PATH_SAVEE не указан в настройках, загрузка cookies пропущена.")
     # Если cookies не загрузились или драйвер всё ещё на странице логина – пробуем magic‑link
-    if ("login" in driver.current_url.lower()) or ("log in" in driver.page_source.lower()):
+    if _needs_login(driver):
         logger.info("Попытка авторизации через magic‑link Savee...")
         magic_status = perform_savee_login(driver)
         if magic_status.get("status") == "success":
@@ -87,57 +157,190 @@ def init_driver():
     return driver
 
 
+# Сторонние запросы, не нужные парсеру: аналитика, реклама, шрифты
+_BLOCKED_URLS = (
+    "*google-analytics*", "*googletagmanager*", "*doubleclick*",
+    "*facebook*", "*hotjar*", "*.woff", "*.woff2",
+)
+
+
+def _block_third_party(driver) -> None:
+    """Запрещает браузеру загрузку _BLOCKED_URLS (CDP Network.setBlockedURLs)."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(_BLOCKED_URLS)})
+    except Exception as e:
+        logger.warning("Не удалось включить блокировку URL через CDP: %s", e)
+
+
+def _launch_chrome():
+    """Запускает отдельный headless Chrome для Savee со временным профилем."""
+    # Настройка опций Chrome
+    options = Options()
+    options.add_argument("--headless=new")  # запуск без интерфейса
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    # Отключаем подсистемы, не нужные скрейпингу: меньше памяти и быстрее старт
+    for flag in (
+        "--disable-extensions",
+        "--disable-background-networking",
+        "--disable-default-apps",
+        "--disable-sync",
+        "--metrics-recording-only",
+        "--mute-audio",
+        "--no-first-run",
+        "--disable-features=Translate,MediaRouter",
+    ):
+        options.add_argument(flag)
+    # Content settings профиля: без запросов на уведомления, а при
+    # SAVEE_BLOCK_IMAGES — без загрузки картинок (src в DOM остаются)
+    prefs = {"profile.default_content_setting_values.notifications": 2}
+    if settings.SAVEE_BLOCK_IMAGES:
+        prefs["profile.managed_default_content_settings.images"] = 2
+    options.add_experimental_option("prefs", prefs)
+    # Создаём временный профиль пользователя
+    temp_profile_dir = tempfile.mkdtemp(prefix="savee_profile_")
+    options.add_argument(f"--user-data-dir={temp_profile_dir}")
+    logger.info("Создан временный профиль для Chrome: %s", temp_profile_dir)
+    # Установка пользовательского агента из настроек
+    user_agent = USER_AGENT
+    if user_agent:
+        options.add_argument(f"--user-agent={user_agent}")
+        logger.info("User-Agent установлен: %s", user_agent)
+    else:
+        logger.warning(
+            "USER_AGENT не указан в настройках, используется по умолчанию")
+    # Инициализация Chrome WebDriver
+    try:
+        driver = webdriver.Chrome(options=options)
+    except Exception as e:
+        logger.error("Ошибка запуска WebDriver: %s", e)
+        raise  # пробрасываем исключение, т.к. драйвер критически не запустился
+    return driver
+
+
+class SaveeDriverPool:
+    """
+    Ограниченный пул прогретых драйверов Savee (cookies уже загружены).
+
+    Драйверы создаются через `init_driver()` по требованию, но не больше
+    `size`; `lease()` выдаёт драйвер, а по возврату он паркуется на
+    about:blank и достаётся следующему скану — запуск Chrome, временный
+    профиль и загрузка cookies оплачиваются один раз на слот, а не на скан.
+    Cookies при возврате не чистятся: в них сессия Savee.
+    """
+
+    def __init__(self, size: int = 4):
+        self.size = size
+        self._idle: list = []
+        self._started = 0
+        # Защищает _idle/_started; notify — когда появился драйвер или слот
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Свободный драйвер; новый, если пул не заполнен; иначе ждём возврата."""
+        with self._cond:
+            while not self._idle and self._started >= self.size:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+        try:
+            return init_driver()
+        except Exception:
+            with self._cond:
+                self._started -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, driver) -> None:
+        """Вернуть драйвер в пул (сломанный закрывается, слот освобождается)."""
+        try:
+            driver.get("about:blank")
+        except Exception as e:
+            logger.warning("Пул Savee: драйвер сломан, закрываем: %s", e)
+            self._discard(driver)
+            return
+        with self._cond:
+            self._idle.append(driver)
+            self._cond.notify()
+
+    def _discard(self, driver) -> None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        # Освободившийся слот тоже будит ожидающего: он запустит новый драйвер
+        with self._cond:
+            self._started -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self) -> Iterator:
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self) -> None:
+        """Закрыть все свободные драйверы."""
+        while True:
+            with self._cond:
+                if not self._idle:
+                    break
+                driver = self._idle.pop()
+            self._discard(driver)
+
+
 def perform_savee_login(driver, login_url: str | None = None) -> dict:
     """Выполняет авторизацию на Savee. Возвращает словарь со статусом и сообщением."""
     if login_url is None:
-        login_url = getattr(settings, "STATE_PATH_SAVEE_URL", None)
+        login_url = SAVEE_LOGIN_URL
     if not login_url:
         logger.error(
             "STATE_PATH_SAVEE_URL not provided; cannot perform Savee login.")
         return {"status": "error", "message": "Magic‑link not provided"}
-    logger.info(f"Переход на страницу авторизации: {login_url}")
+    logger.info("Переход на страницу авторизации: %s", login_url)
     try:
         driver.get(login_url)
     except Exception as e:
-        logger.error(f"Не удалось открыть страницу логина: {e}")
+        logger.error("Не удалось открыть страницу логина: %s", e)
         return {"status": "error", "message": f"Ошибка открытия {login_url}: {e}"}
-    # Ожидание загрузки страницы и потенциальной авторизации
-    # даём время на редирект после входа (если cookie уже были валидны)
-    time.sleep(5)
+    # Ожидание загрузки страницы и потенциальной авторизации: ждём редирект
+    # с /login и первые картинки — не дольше 10 с, но не дольше, чем нужно
+    try:
+        WebDriverWait(driver, 10, poll_frequency=0.2).until(_logged_in)
+        logged_in = True
+    except TimeoutException:
+        logged_in = False
     current_url = driver.current_url
-    imgs = driver.find_elements(By.TAG_NAME, "img")
-    if "login" not in current_url.lower() and len(imgs) > 0:
+    if logged_in:
         # Успешная авторизация (мы не на странице /login, и на странице есть изображения)
-        logger.info(f"Авторизация успешна, текущий URL: {current_url}")
+        logger.info("Авторизация успешна, текущий URL: %s", current_url)
         # Сохранение cookies в файл состояния
-        state_path = getattr(settings, "STATE_PATH_SAVEE", None)
+        state_path = STATE_PATH_SAVEE
         if state_path:
             try:
-                with open(state_path, "wb") as cookie_file:
-                    pickle.dump(driver.get_cookies(), cookie_file)
-                logger.info(f"Cookies сохранены в файл: {state_path}")
+                cookie_store.save_cookies(state_path, driver.get_cookies())
+                logger.info("Cookies сохранены в файл: %s", state_path)
             except Exception as e:
                 logger.error(
-                    f"Ошибка при сохранении cookies в {state_path}: {e}")
+                    "Ошибка при сохранении cookies в %s: %s", state_path, e)
         else:
             logger.warning(
                 "STATE_PATH_SAVEE не задан, cookies не сохранены на диск.")
         return {"status": "success", "message": "Login successful"}
     else:
         # Не удалось авторизоваться
-        logger.error(f"Авторизация не удалась. Текущий URL: {current_url}")
+        logger.error("Авторизация не удалась. Текущий URL: %s", current_url)
         return {"status": "error", "message": "Login failed or not authenticated"}
 
 
-def parse_savee_profile(driver, profile_url, start_index) -> dict:
-    """Парсит страницу профиля Savee и возвращает информацию о новом элементе (изображении/видео)."""
-    # Индекс не может быть отрицательным
-    start_index = max(0, start_index)
-
-    logger.info(
-        f"Запуск парсинга профиля: {profile_url}, start_index={start_index}")
+def _empty_result(start_index: int) -> dict:
     # Единый словарь результата (как в cosmos_driver)
-    result = {
+    return {
         "hit": False,
         "image_url": None,
         "saves": 0,
@@ -145,77 +348,71 @@ def parse_savee_profile(driver, profile_url, start_index) -> dict:
         "error": None
     }
 
-    # Добавляем диагностическую информацию
-    logger.info("ДИАГНОСТИКА: Начало парсинга Savee с индекса %s", start_index)
 
+def _open_profile(driver, profile_url) -> str | None:
+    """Проверяет авторизацию и открывает профиль; текст ошибки или None."""
     # Проверка авторизации (если на странице присутствует кнопка входа или подобный признак)
-    page_source = driver.page_source.lower()
-    if "log in" in page_source or "login" in driver.current_url.lower():
+    if _needs_login(driver):
         logger.warning(
             "Не авторизовано на Savee. Пытаемся загрузить cookies и обновить сессию...")
-        state_path = getattr(settings, "STATE_PATH_SAVEE", None)
+        state_path = STATE_PATH_SAVEE
         if state_path:
             try:
-                with open(state_path, "rb") as cookie_file:
-                    cookies = pickle.load(cookie_file)
+                cookies = cookie_store.load_cookies(state_path)
                 # открываем домен перед добавлением cookie
                 driver.get("https://savee.it")
-                for cookie in cookies:
-                    cookie_data = cookie.copy()
-                    cookie_data.pop("sameSite", None)
+                for cookie_data in _savee_cookies(cookies):
                     try:
                         driver.add_cookie(cookie_data)
                     except Exception as e:
                         logger.warning(
-                            f"Не удалось добавить cookie {cookie_data.get('name')}: {e}")
+                            "Не удалось добавить cookie %s: %s", cookie_data.get('name'), e)
                 # пробуем снова открыть профиль после загрузки cookies
                 driver.get(profile_url)
                 logger.info(
                     "Cookies загружены из файла, повторно открываем профиль.")
             except Exception as e:
                 logger.error(
-                    f"Не удалось загрузить cookies для авторизации: {e}")
-                result["error"] = "Авторизация требуется, но загрузка cookies не удалась"
-                return result
+                    "Не удалось загрузить cookies для авторизации: %s", e)
+                return "Авторизация требуется, но загрузка cookies не удалась"
         else:
             logger.error("Отсутствует файл с cookies, авторизация невозможна.")
-            result["error"] = "Требуется авторизация для просмотра профиля"
-            return result
+            return "Требуется авторизация для просмотра профиля"
     # Переход на профиль, если он ещё не загружен или изменился
     current_url = driver.current_url
     if not current_url.startswith(profile_url):
         try:
             driver.get(profile_url)
-            logger.info(f"Открыта страница профиля: {profile_url}")
+            logger.info("Открыта страница профиля: %s", profile_url)
         except Exception as e:
-            logger.error(f"Ошибка при открытии профиля {profile_url}: {e}")
-            result["error"] = f"Не удалось открыть профиль: {e}"
-            return result
+            logger.error("Ошибка при открытии профиля %s: %s", profile_url, e)
+            return f"Не удалось открыть профиль: {e}"
     else:
         logger.info(
             "Профиль уже загружен в браузере, повторный переход не требуется.")
+    return None
+
 
+def _scroll_to(driver, needed_index: int) -> None:
+    """Прокручивает ленту, пока в DOM не окажется карточка `needed_index`."""
     # ─── Умный скроллинг ──────────────────────────────────────────────
     # Если уже загруженных карточек достаточно, прокрутка не нужна.
     max_scrolls = 5          # ограничение «защиты от зависания»
     scrolls_done = 0
 
+    # Сколько карточек сейчас в DOM?
+    current_count = driver.execute_script(_MEDIA_COUNT_JS)
     while True:
-        # Сколько карточек сейчас в DOM?
-        current_imgs = driver.find_elements(By.TAG_NAME, "img")
-        current_videos = driver.find_elements(By.TAG_NAME, "video")
-        current_count = len(current_imgs) + len(current_videos)
-
-        if current_count > start_index:
+        if current_count > needed_index:
             logger.debug(
-                "В DOM уже %s карточек (> start_index=%s) — скролл не требуется.",
-                current_count, start_index)
+                "В DOM уже %s карточек (> needed_index=%s) — скролл не требуется.",
+                current_count, needed_index)
             break
 
         if scrolls_done >= max_scrolls:
             logger.warning(
-                "Достигнут лимит прокруток (%s), карточек всё ещё %s ≤ start_index=%s",
-                max_scrolls, current_count, start_index)
+                "Достигнут лимит прокруток (%s), карточек всё ещё %s ≤ needed_index=%s",
+                max_scrolls, current_count, needed_index)
             break
 
         # Скроллим в самый низ, ждём подгрузку
@@ -228,201 +425,205 @@ def parse_savee_profile(driver, profile_url, start_index) -> dict:
             logger.warning("Ошибка при прокрутке: %s", e)
             break
 
-        time.sleep(settings.SCROLL_DELAY_SEC or 2)
-    # Сбор всех элементов <img> и <video> на странице
-    img_elements = driver.find_elements(By.TAG_NAME, "img")
-    video_elements = driver.find_elements(By.TAG_NAME, "video")
-    logger.info(
-        f"Найдено элементов: изображений - {len(img_elements)}, видео - {len(video_elements)}")
-    # Извлекаем URL из элементов и фильтруем по расширению
-    media_urls = []
-    for img in img_elements:
-        src = img.get_attribute("src")
-        if src and src.lower().endswith((".webp", ".jpg", ".jpeg", ".png")):
-            media_urls.append(src)
-    for video in video_elements:
-        src = video.get_attribute("src")
-        if src and src.endswith(".mp4"):
-            media_urls.append(src)
-        # Также проверяем вложенные источники <source> внутри видео, если есть
+        # Ждём, пока подгрузятся новые карточки (не дольше SCROLL_DELAY_SEC);
+        # если не подгрузились — следующая итерация прокрутит ещё раз
         try:
-            source_elems = video.find_elements(By.TAG_NAME, "source")
-            for source in source_elems:
-                src = source.get_attribute("src")
-                if src and src.endswith(".mp4"):
-                    media_urls.append(src)
-        except Exception:
+            current_count = WebDriverWait(
+                driver, settings.SCROLL_DELAY_SEC or 2, poll_frequency=0.1
+            ).until(_media_grew(current_count))
+        except TimeoutException:
             pass
+
+
+def _collect_media(driver) -> tuple[list[str], dict]:
+    """Медиа-URL профиля по порядку и словарь src → <img> карточки."""
+    # Сбор src всех <img>, <video> и <source> на странице — одним запросом
+    media = driver.execute_script(_MEDIA_SRCS_JS)
+    logger.info(
+        "Найдено элементов: изображений - %s, видео - %s",
+        sum(1 for tag, _, _ in media if tag == "IMG"),
+        sum(1 for tag, _, _ in media if tag == "VIDEO"))
+    # Фильтруем по расширению уже в Python: картинки — по _IMAGE_EXTS,
+    # видео и вложенные <source> — только .mp4
+    media_urls = [
+        src for tag, src, _ in media
+        if src and (src.lower().endswith(_IMAGE_EXTS) if tag == "IMG"
+                    else src.endswith(".mp4"))
+    ]
     logger.info(
-        f"Отфильтровано медиа URL с требуемыми расширениями: {len(media_urls)} шт.")
+        "Отфильтровано медиа URL с требуемыми расширениями: %s шт.", len(media_urls))
     # Удаляем дубликаты URL, если появились
     media_urls = list(dict.fromkeys(media_urls))
-    logger.info(f"Уникальных URL после удаления дубликатов: {len(media_urls)}")
-
-    processed = 0  # сколько изображений обработано в этом вызове
-    for idx, url in enumerate(media_urls):
-        # Просто выбираем элемент по порядковому индексу без проверки хэша/уникальности
-        if idx < start_index:
-            processed += 1
-            continue  # пропускаем до нужного индекса
+    logger.info("Уникальных URL после удаления дубликатов: %s", len(media_urls))
+    # src → первый <img> с ним: элемент карточки без повторного обхода DOM
+    img_by_url = {}
+    for tag, src, el in media:
+        if tag == "IMG" and src:
+            img_by_url.setdefault(src, el)
+    return media_urls, img_by_url
+
+
+def _card_saves(driver, target_img) -> int:
+    """Число сохранений карточки по её <img> (None — видео, 0)."""
+    if target_img is None:
+        return 0
+    saves_count = 0
+    try:
+        logger.info(
+            "ДИАГНОСТИКА: Найдено совпадающее изображение в DOM")
+
+        # Сначала проверяем самый простой случай - число внутри атрибутов самого изображения
+        data_attrs = driver.execute_script("""
+            var attrs = {};
+            var elem = arguments[0];
+            for (var i = 0; i < elem.attributes.length; i++) {
+                var attr = elem.attributes[i];
+                if (attr.name.startsWith('data-') && !isNaN(parseInt(attr.value))) {
+                    attrs[attr.name] = attr.value;
+                }
+            }
+            return attrs;
+        """, target_img)
+
+        for attr_name, attr_value in data_attrs.items():
+            if 'save' in attr_name.lower() or 'like' in attr_name.lower():
+                try:
+                    saves_count = int(attr_value)
+                    logger.info(
+                        "ДИАГНОСТИКА: Найдено число сохранений в атрибуте %s: %s", attr_name, saves_count)
+                    break
+                except:
+                    pass
 
-        image_url = url
-        logger.info(f"Выбрано изображение по индексу {idx}: URL={image_url}")
+        # Если не нашли — число в потомках самой карточки и её
+        # предков (до 8 уровней вверх); обход целиком в браузере
+        if saves_count == 0:
+            found = driver.execute_script(_ANCESTOR_NUMBER_JS, target_img)
+            if found:
+                saves_count = found
+                logger.info(
+                    "ДИАГНОСТИКА: Найдено количество сохранений: %s", saves_count)
+    except Exception as e:
+        logger.warning("Ошибка при извлечении количества сохранений: %s", e)
 
-        # Получаем количество сохранений для этого изображения
-        saves_count = 0
+    # 5. Крайняя мера: ищем число рядом с изображением по всей странице
+    if saves_count == 0:
         try:
-            # Находим все контейнеры с изображениями
-            for img in img_elements:
-                current_src = img.get_attribute("src")
-                if current_src == image_url:
-                    logger.info(
-                        "ДИАГНОСТИКА: Найдено совпадающее изображение в DOM")
-
-                    # Сначала ищем числа рядом с изображением в разных направлениях DOM
-                    current_elem = img
-                    parent_levels = [current_elem]
-
-                    # Сначала проверяем самый простой случай - число внутри атрибутов самого изображения
-                    data_attrs = driver.execute_script("""
-                        var attrs = {};
-                        var elem = arguments[0];
-                        for (var i = 0; i < elem.attributes.length; i++) {
-                            var attr = elem.attributes[i];
-                            if (attr.name.startsWith('data-') && !isNaN(parseInt(attr.value))) {
-                                attrs[attr.name] = attr.value;
-                            }
-                        }
-                        return attrs;
-                    """, img)
-
-                    for attr_name, attr_value in data_attrs.items():
-                        if 'save' in attr_name.lower() or 'like' in attr_name.lower():
-                            try:
-                                saves_count = int(attr_value)
-                                logger.info(
-                                    f"ДИАГНОСТИКА: Найдено число сохранений в атрибуте {attr_name}: {saves_count}")
-                                break
-                            except:
-                                pass
-
-                    # Если не нашли, продолжаем искать в соседних и родительских элементах
-                    # Проверяем до 8 уровней вверх
-                    for level in range(8):
-                        try:
-                            # 1. Ищем span или div с только числом внутри
-                            for selector in [
-                                ".//span[text()[not(contains(., ' '))]][string-length(normalize-space()) <= 5]",
-                                ".//div[text()[not(contains(., ' '))]][string-length(normalize-space()) <= 5]",
-                                ".//span[contains(@class, 'save')]",
-                                ".//span[contains(@class, 'like')]",
-                                ".//span[contains(@class, 'count')]",
-                                ".//div[contains(@class, 'save')]",
-                                ".//div[contains(@class, 'like')]",
-                                ".//div[contains(@class, 'count')]",
-                                ".//span",
-                                ".//div"
-                            ]:
-                                elements = current_elem.find_elements(
-                                    By.XPATH, selector)
-                                for element in elements:
-                                    text = element.text.strip()
-                                    logger.info(
-                                        f"ДИАГНОСТИКА: Найден элемент с селектором {selector}, текст: '{text}'")
-                                    if text and text.isdigit():
-                                        saves_count = int(text)
-                                        logger.info(
-                                            f"ДИАГНОСТИКА: Найдено количество сохранений: {saves_count}")
-                                        break
-                        except Exception as e:
-                            logger.warning(
-                                f"Ошибка при поиске по селекторам: {e}")
-
-                        # 2. Ищем span или div с только числом внутри
-                        for selector in [
-                            ".//span[text()[not(contains(., ' '))]][string-length(normalize-space()) <= 5]",
-                            ".//div[text()[not(contains(., ' '))]][string-length(normalize-space()) <= 5]",
-                            ".//span[contains(@class, 'save')]",
-                            ".//span[contains(@class, 'like')]",
-                            ".//span[contains(@class, 'count')]",
-                            ".//div[contains(@class, 'save')]",
-                            ".//div[contains(@class, 'like')]",
-                            ".//div[contains(@class, 'count')]",
-                            ".//span",
-                            ".//div"
-                        ]:
-                            elements = current_elem.find_elements(
-                                By.XPATH, selector)
-                            for element in elements:
-                                text = element.text.strip()
-                                logger.info(
-                                    f"ДИАГНОСТИКА: Найден элемент с селектором {selector}, текст: '{text}'")
-                                if text and text.isdigit():
-                                    saves_count = int(text)
-                                    logger.info(
-                                        f"ДИАГНОСТИКА: Найдено количество сохранений: {saves_count}")
-                                    break
-
-                        # Если нашли хоть какое-то число, выходим из цикла
-                        if saves_count > 0:
-                            break
-
-                        # Переходим на следующий уровень
-                        if current_elem.parentElement:
-                            current_elem = current_elem.parentElement
-                        else:
-                            break
-
-                    # Если нашли хоть какое-то число, выходим из цикла
-                    if saves_count > 0:
-                        break
+            logger.info("ДИАГНОСТИКА: Поиск чисел на всей странице...")
+            # Весь обход DOM — в браузере, одним запросом
+            found = driver.execute_script(_NEARBY_NUMBER_JS, target_img)
+            if found:
+                saves_count, distance = int(found[0]), found[1]
+                logger.info(
+                    "ДИАГНОСТИКА: Найдено число %s на расстоянии %s пикселей от изображения", saves_count, distance)
         except Exception as e:
-            logger.warning(f"Ошибка при извлечении количества сохранений: {e}")
+            logger.warning("Ошибка при поиске чисел на странице: %s", e)
+    return saves_count
 
-        # 5. Крайняя мера: проверяем всю страницу на наличие чисел рядом с изображениями
-        if saves_count == 0:
-            try:
-                logger.info("ДИАГНОСТИКА: Поиск чисел на всей странице...")
-                # Проверяем весь DOM-дерево, чтобы найти числа
-                all_elements = driver.find_elements(By.XPATH, "//*")
-                for elem in all_elements:
-                    try:
-                        text = elem.text.strip()
-                        if text and text.isdigit():
-                            # Проверяем расстояние до нашего изображения
-                            rect1 = img.rect
-                            rect2 = elem.rect
-                            # Если элемент с числом находится рядом с изображением (например, в пределах 100px)
-                            distance = (
-                                (rect1['x'] - rect2['x'])**2 + (rect1['y'] - rect2['y'])**2)**0.5
-                            if distance < 200:  # примерное расстояние в пикселях
-                                saves_count = int(text)
-                                logger.info(
-                                    f"ДИАГНОСТИКА: Найдено число {saves_count} на расстоянии {distance} пикселей от изображения")
-                                break
-                    except Exception:
-                        continue
-            except Exception as e:
-                logger.warning(f"Ошибка при поиске чисел на странице: {e}")
+
+def _card_result(driver, start_index: int, media_urls: list[str], img_by_url: dict) -> dict:
+    """Результат для карточки `start_index` из уже собранных медиа профиля."""
+    result = _empty_result(start_index)
+    if start_index < len(media_urls):
+        image_url = media_urls[start_index]
+        logger.info("Выбрано изображение по индексу %s: URL=%s", start_index, image_url)
+        # <img> этой карточки в DOM, если нашлась (у видео её нет)
+        saves_count = _card_saves(driver, img_by_url.get(image_url))
 
         # Устанавливаем результат в зависимости от количества сохранений
         result["image_url"] = image_url
         result["saves"] = saves_count
         logger.info(
-            f"ДИАГНОСТИКА: Итоговое количество сохранений: {saves_count}")
-        processed += 1  # учитываем текущее изображение
+            "ДИАГНОСТИКА: Итоговое количество сохранений: %s", saves_count)
+        # Пропущенные до start_index карточки + текущая
+        processed = start_index + 1
         # Четко указываем, что следующий индекс должен быть увеличен
         result["next_index"] = start_index + processed
         logger.info(
-            f"Обработано изображение, новый индекс: {result['next_index']}")
+            "Обработано изображение, новый индекс: %s", result['next_index'])
         return result
 
     # --- Если дошли до конца списка без hit ---
-    # Увеличиваем индекс ровно на количество обработанных карточек
-    if processed == 0:
-        processed = 1  # хотя бы одну карточку «просмотрели»
+    # Увеличиваем индекс ровно на количество просмотренных карточек
+    processed = len(media_urls) or 1  # хотя бы одну карточку «просмотрели»
     result["next_index"] = start_index + processed
     logger.info(
-        f"Новых элементов для указанного индекса не найдено. Просмотрено {processed} карточек. Новый индекс: {result['next_index']}")
+        "Новых элементов для указанного индекса не найдено. Просмотрено %s карточек. Новый индекс: %s", processed, result['next_index'])
     result["error"] = "Новые изображения отсутствуют"
     return result
+
+
+def parse_savee_profile(driver, profile_url, start_index) -> dict:
+    """Парсит страницу профиля Savee и возвращает информацию о новом элементе (изображении/видео)."""
+    # Индекс не может быть отрицательным
+    start_index = max(0, start_index)
+
+    logger.info(
+        "Запуск парсинга профиля: %s, start_index=%s", profile_url, start_index)
+    # Добавляем диагностическую информацию
+    logger.info("ДИАГНОСТИКА: Начало парсинга Savee с индекса %s", start_index)
+
+    error = _open_profile(driver, profile_url)
+    if error:
+        result = _empty_result(start_index)
+        result["error"] = error
+        return result
+    _scroll_to(driver, start_index)
+    media_urls, img_by_url = _collect_media(driver)
+    return _card_result(driver, start_index, media_urls, img_by_url)
+
+
+def parse_savee_profile_batch(driver, profile_url, indices) -> list[dict]:
+    """
+    То же, что `parse_savee_profile`, но сразу для нескольких индексов.
+
+    Профиль открывается и прокручивается один раз (до максимального
+    индекса), медиа собираются одним проходом; на каждый индекс — словарь
+    результата в том же формате и порядке, что и `indices`.
+    """
+    indices = [max(0, i) for i in indices]
+    if not indices:
+        return []
+    logger.info("Пакетный парсинг профиля: %s, индексы=%s", profile_url, indices)
+
+    error = _open_profile(driver, profile_url)
+    if error:
+        return [dict(_empty_result(i), error=error) for i in indices]
+    _scroll_to(driver, max(indices))
+    media_urls, img_by_url = _collect_media(driver)
+    return [_card_result(driver, i, media_urls, img_by_url) for i in indices]
+
+
+def scan_profiles(profile_urls, pool: SaveeDriverPool | None = None,
+                  start_index: int = 0) -> dict:
+    """
+    Параллельно парсит несколько профилей Savee: `{profile_url: результат}`.
+
+    Каждый поток берёт из пула свой драйвер (общих Selenium-сессий нет),
+    потоков не больше `pool.size`. Ошибка профиля не роняет остальные —
+    она попадает в его результат как `{"error": ...}`. Без `pool` создаётся
+    временный пул на 4 драйвера и закрывается по завершении.
+    """
+    own_pool = pool is None
+    if own_pool:
+        pool = SaveeDriverPool()
+
+    def scan(url: str) -> dict:
+        with pool.lease() as driver:
+            return parse_savee_profile(driver, url, start_index)
+
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=pool.size) as executor:
+            futures = {executor.submit(scan, url): url for url in profile_urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    results[url] = future.result()
+                except Exception as e:
+                    logger.error("Ошибка при парсинге профиля %s: %s", url, e)
+                    results[url] = {"error": str(e)}
+    finally:
+        if own_pool:
+            pool.close()
+    return results
@@ -0,0 +1,168 @@
+"""
+Один общий процесс Chrome для драйверов Savee и Cosmos.
+
+Вместо двух полноценных `webdriver.Chrome` (каждый со своим браузером)
+запускаем один headless Chrome с `--remote-debugging-port`, а драйверы
+подключаются к нему через `debugger_address` и работают каждый в своей
+вкладке. Домены разные (savee.it / cosmos.so), поэтому общий профиль
+cookie не смешивает.
+
+Включается настройкой `SHARE_CHROME=1`; бинарник берётся из `CHROME_BINARY`.
+
+Флаги и prefs у процесса общие: здесь собрано объединение того, что задают
+`savee_driver._launch_chrome` и `CosmosDriver._launch_chrome`. Исключение —
+`SAVEE_BLOCK_IMAGES`: это pref всего профиля, он отключил бы картинки и во
+вкладке Cosmos, поэтому при SHARE_CHROME не применяется. Картинки в общем
+Chrome блокирует только `COSMOS_BLOCK_IMAGES` (CDP, в своей вкладке).
+"""
+
+import json
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.request
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from like_scanner.config import settings
+
+logger = logging.getLogger("like_scanner.infra.drivers.shared_chrome")
+
+_lock = threading.Lock()
+_process: subprocess.Popen | None = None
+_address: str | None = None
+_profile_dir: str | None = None
+
+# Объединение флагов обоих драйверов. --disable-features — одним ключом:
+# Chrome учитывает только последний
+_FLAGS = (
+    "--headless=new",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-software-rasterizer",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--no-first-run",
+    # Вкладки общего процесса почти всегда фоновые — не даём их притормаживать
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--js-flags=--max-old-space-size=512",
+    "--disable-features=BlockInsecurePrivateNetworkRequests,Translate,MediaRouter",
+    "--remote-allow-origins=*",
+    "--disable-notifications",
+    "--disable-blink-features=AutomationControlled",
+    "--window-size=1280,900",
+)
+
+# Prefs профиля (как `prefs` у драйверов): без запросов на уведомления.
+# Без chromedriver их можно задать только файлом Default/Preferences
+_PREFS = {"profile": {"default_content_setting_values": {"notifications": 2}}}
+
+
+# --------------------------------------------------------------------------- #
+# Browser process                                                             #
+# --------------------------------------------------------------------------- #
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_devtools(address: str, timeout: float = 15.0) -> None:
+    """Ждёт, пока DevTools endpoint начнёт отвечать."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f"http://{address}/json/version", timeout=1) as resp:
+                json.load(resp)
+            return
+        except Exception:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Shared Chrome did not start on {address}")
+            time.sleep(0.1)
+
+
+def _new_profile_dir() -> str:
+    """Временный профиль с prefs; профиль прошлого (упавшего) процесса удаляется."""
+    global _profile_dir
+    if _profile_dir is not None:
+        shutil.rmtree(_profile_dir, ignore_errors=True)
+    _profile_dir = tempfile.mkdtemp(prefix="shared_chrome_")
+    os.makedirs(os.path.join(_profile_dir, "Default"))
+    with open(os.path.join(_profile_dir, "Default", "Preferences"), "w") as fh:
+        json.dump(_PREFS, fh)
+    return _profile_dir
+
+
+def debugger_address() -> str:
+    """Запускает общий Chrome (один раз на процесс) и возвращает host:port."""
+    global _process, _address
+    with _lock:
+        if _process is not None and _process.poll() is None:
+            return _address
+
+        port = _free_port()
+        cmd = [
+            settings.CHROME_BINARY,
+            f"--remote-debugging-port={port}",
+            f"--user-data-dir={_new_profile_dir()}",
+            *_FLAGS,
+            f"--user-agent={settings.USER_AGENT}",
+            "about:blank",
+        ]
+        _process = subprocess.Popen(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        _address = f"127.0.0.1:{port}"
+        _wait_for_devtools(_address)
+        logger.info("Shared Chrome started (pid=%s, %s).", _process.pid, _address)
+        return _address
+
+
+def attach_driver(page_load_strategy: str | None = None) -> webdriver.Chrome:
+    """
+    Подключает новый WebDriver к общему Chrome и открывает для него
+    отдельную вкладку, чтобы драйверы не мешали друг другу.
+
+    Флаги браузера (headless, user-agent …) задаются при запуске процесса,
+    поэтому здесь передаётся только `debugger_address` и, по желанию,
+    стратегия загрузки страниц сессии (`"eager"` и т.п.).
+    """
+    options = Options()
+    options.debugger_address = debugger_address()
+    if page_load_strategy:
+        options.page_load_strategy = page_load_strategy
+    driver = webdriver.Chrome(options=options)
+    driver.switch_to.new_window("tab")
+    return driver
+
+
+def shutdown() -> None:
+    """Завершает общий Chrome (вызывается при остановке приложения)."""
+    global _process, _address, _profile_dir
+    with _lock:
+        if _process is not None:
+            _process.terminate()
+            try:
+                _process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                _process.kill()
+                _process.wait()
+            logger.info("Shared Chrome stopped.")
+            _process = None
+            _address = None
+        # Временный профиль больше не нужен — иначе каждый запуск оставлял бы его
+        if _profile_dir is not None:
+            shutil.rmtree(_profile_dir, ignore_errors=True)
+            _profile_dir = None
@@ -1,6 +1,9 @@
+import atexit
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 try:
     # Получаем уровень логирования из настроек (если определено)
     from settings import LOG_LEVEL as LOG_LEVEL_SETTING
@@ -21,15 +24,71 @@ file_handler = TimedRotatingFileHandler(
 # Создаём обработчик для вывода в консоль
 console_handler = logging.StreamHandler()
 
-# Задаём формат для логов
-formatter = logging.Formatter(
+class _SecondCachedFormatter(logging.Formatter):
+    """
+    Formatter, который строит строку времени (localtime + strftime) один
+    раз на секунду: datefmt без миллисекунд, так что все записи одной
+    секунды получают одинаковый `asctime`. Вызывается только из потока
+    QueueListener, поэтому кэш без блокировок.
+    """
+
+    _cached_sec: int = -1
+    _cached_str: str = ""
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        sec = int(record.created)
+        if sec != self._cached_sec:
+            self._cached_str = super().formatTime(record, datefmt)
+            self._cached_sec = sec
+        return self._cached_str
+
+
+# Задаём формат для логов — один общий экземпляр для файла и консоли
+formatter = _SecondCachedFormatter(
     "[%(asctime)s] %(levelname)s [%(name)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
 )
 file_handler.setFormatter(formatter)
 console_handler.setFormatter(formatter)
 
-# Регистрируем глобальный логгер и добавляем ему обработчики
+# Реальный I/O (файл + консоль) выполняет фоновый поток QueueListener,
+# а корневой логгер только кладёт записи в очередь — O(1) в потоке запроса.
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+queue_handler = QueueHandler(log_queue)
+listener = QueueListener(
+    log_queue, file_handler, console_handler, respect_handler_level=True
+)
+
+# Регистрируем глобальный логгер и добавляем ему обработчик очереди
 logger = logging.getLogger()  # корневой логгер
 logger.setLevel(level)
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
+logger.addHandler(queue_handler)
+
+
+# Состояние потока записи ведём сами, а не через приватный listener._thread
+_listener_lock = threading.Lock()
+_listener_running = False
+
+
+def start_listener() -> None:
+    """Запускает фоновый поток записи логов (повторный вызов безопасен)."""
+    global _listener_running
+    with _listener_lock:
+        if not _listener_running:
+            listener.start()
+            _listener_running = True
+
+
+def stop_listener() -> None:
+    """Останавливает поток и дописывает оставшиеся в очереди записи."""
+    global _listener_running
+    with _listener_lock:
+        if _listener_running:
+            listener.stop()
+            _listener_running = False
+
+
+# Поток стартует вместе с QueueHandler: иначе записи скриптов, пулов и
+# scan_batch вне FastAPI копились бы в очереди, которую никто не читает.
+# При выходе процесса очередь дописывается.
+start_listener()
+atexit.register(stop_listener)
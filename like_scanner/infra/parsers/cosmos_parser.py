@@ -1,6 +1,6 @@
+import json
 import logging
 import re
-import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
@@ -10,6 +10,41 @@ from core.models import ScanResult
 
 logger = logging.getLogger(__name__)
 
+_CARD_SELECTOR = ".css-11m6wtf"
+_MAX_SCROLL_ATTEMPTS = 50
+_SCROLL_WAIT_MS = 1000
+
+# Scrolls to the bottom until at least `target` cards match `selector`. After
+# each scroll a MutationObserver waits up to `waitMs` for the card count to
+# grow; if it does not, scrolling stops. Resolves with the final count.
+_SCROLL_TO_TARGET_JS = """
+(async function (selector, target, maxAttempts, waitMs) {
+    function count() { return document.querySelectorAll(selector).length; }
+    function grew(before) {
+        return new Promise(function (resolve) {
+            var timer;
+            var obs = new MutationObserver(function () {
+                if (count() > before) {
+                    obs.disconnect(); clearTimeout(timer); resolve(true);
+                }
+            });
+            timer = setTimeout(function () { obs.disconnect(); resolve(false); }, waitMs);
+            obs.observe(document.body, {childList: true, subtree: true});
+        });
+    }
+    var n = count();
+    for (var i = 0; i < maxAttempts && n < target; i++) {
+        window.scrollTo(0, document.body.scrollHeight);
+        if (!(await grew(n))) break;
+        n = count();
+    }
+    return n;
+})(%s, %d, %d, %d)
+"""
+
+# Non-digit runs stripped from the saves label ("1,234 saves" -> "1234")
+_NON_DIGITS_RE = re.compile(r"\D+")
+
 
 def process_one(driver, profile_url: str, index: int) -> ScanResult:
     """
@@ -34,37 +69,22 @@ def process_one(driver, profile_url: str, index: int) -> ScanResult:
             logger.debug(
                 f"Already on profile page '{profile_url}', no navigation needed")
 
-        # Scroll until the target card is loaded
+        # Scroll until the target card is loaded: the whole loop (scroll, wait
+        # for new cards, recount) runs in the page as one CDP call
         target_count = index + 1
-        scroll_attempts = 0
-        max_scroll_attempts = 50
-        last_count = 0
-        # Initial retrieval of cards
-        cards = driver.find_elements(By.CSS_SELECTOR, ".css-11m6wtf")
-        logger.debug(
-            f"Initial cards loaded: {len(cards)} (target {target_count})")
-        # Keep scrolling until we have enough cards or reach limits
-        while len(cards) < target_count and scroll_attempts < max_scroll_attempts:
-            scroll_attempts += 1
-            logger.debug(
-                f"Scrolling... attempt {scroll_attempts}, currently {len(cards)} cards loaded")
-            try:
-                driver.execute_script(
-                    "window.scrollTo(0, document.body.scrollHeight);")
-            except Exception as e:
-                logger.warning(
-                    f"Exception during scrolling attempt {scroll_attempts}: {e}")
-            # Wait a bit for new cards to load
-            time.sleep(1)
-            cards = driver.find_elements(By.CSS_SELECTOR, ".css-11m6wtf")
-            logger.debug(
-                f"Cards after scroll attempt {scroll_attempts}: {len(cards)}")
-            if len(cards) == last_count:
-                # No new cards loaded, break to avoid infinite loop
-                logger.debug(
-                    "No new cards loaded on last scroll, stopping further scroll attempts")
-                break
-            last_count = len(cards)
+        try:
+            loaded = driver.execute_cdp_cmd("Runtime.evaluate", {
+                "expression": _SCROLL_TO_TARGET_JS % (
+                    json.dumps(_CARD_SELECTOR), target_count,
+                    _MAX_SCROLL_ATTEMPTS, _SCROLL_WAIT_MS),
+                "awaitPromise": True,
+                "returnByValue": True,
+            })["result"].get("value")
+            logger.debug("Cards loaded after scrolling: %s (target %s)",
+                         loaded, target_count)
+        except Exception as e:
+            logger.warning("Exception while scrolling to card %s: %s", index, e)
+        cards = driver.find_elements(By.CSS_SELECTOR, _CARD_SELECTOR)
         # After scrolling, check if the desired index is available
         if len(cards) <= index:
             error_msg = f"Card at index {index} not found (only {len(cards)} cards loaded)"
@@ -98,7 +118,7 @@ def process_one(driver, profile_url: str, index: int) -> ScanResult:
         saves_text = saves_elem.text
         try:
             # Remove any non-digit characters (in case the text includes label) and convert to int
-            saves_num = int(''.join(filter(str.isdigit, saves_text)))
+            saves_num = int(_NON_DIGITS_RE.sub("", saves_text))
         except ValueError:
             error_msg = f"Could not parse saves count from text: '{saves_text}'"
             logger.error(error_msg)
@@ -1,86 +1,166 @@
 import logging
-from core.models import ScanResult
-# Assuming parse_savee_profile and check_uniqueness are provided by the project:
-from drivers.savee_driver import parse_savee_profile
-import re
+from functools import lru_cache
+from like_scanner.core.constants import LIKES_THRESHOLD
+from like_scanner.core.models import MediaItem, ScanResult
+from like_scanner.infra.drivers.savee_driver import parse_savee_profile, parse_savee_profile_batch
 
 logger = logging.getLogger(__name__)
 
+# Multipliers for abbreviated counts in the Savee UI ("1.2k Saves")
+_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+# Thousands separators dropped from the digit run in one C-level pass
+_DROP_COMMAS = str.maketrans('', '', ',')
+# Only ASCII digits count: str.isdigit() also accepts '²', '٣' ...
+_DIGITS = frozenset('0123456789')
+
+
+def _count_token(token: str) -> int | None:
+    """Value of one whitespace-separated token, None unless all of it is a count."""
+    multiplier = _SUFFIXES.get(token[-1:].lower())
+    if multiplier is not None:
+        token = token[:-1]
+    whole, dot, fraction = token.partition('.')
+    if not dot:
+        head, comma, tail = whole.rpartition(',')
+        # Thousands groups have three digits; a shorter tail is a decimal
+        # comma ("1,5k", "1,0"), not part of the integer
+        if comma and len(tail) < 3:
+            whole, dot, fraction = head, comma, tail
+    first, *groups = whole.split(',')
+    if not first or any(len(group) != 3 for group in groups):
+        return None
+    digits = whole.translate(_DROP_COMMAS)
+    if not _DIGITS.issuperset(digits):
+        return None
+    if dot and (not fraction or not _DIGITS.issuperset(fraction)):
+        return None
+    if multiplier is None:
+        return int(digits)
+    return round(float(f"{digits}.{fraction or '0'}") * multiplier)
+
+
+# Pure function of the label; the same few labels repeat across a profile
+@lru_cache(maxsize=4096)
+def _parse_saves(saves_text: str) -> int:
+    """
+    First token of a saves label that is a whole count, 0 if there is none.
+
+    >>> _parse_saves("23 Saves"), _parse_saves("1,234"), _parse_saves("1,0")
+    (23, 1234, 1)
+    >>> _parse_saves("1,5k"), _parse_saves("12,345,678")
+    (1500, 12345678)
+    >>> _parse_saves("1.2k"), _parse_saves("3M"), _parse_saves("v2 1.2k saves")
+    (1200, 3000000, 1200)
+    >>> _parse_saves("1.2kg"), _parse_saves("²3"), _parse_saves("1,2,3"), _parse_saves("")
+    (0, 0, 0, 0)
+    """
+    for token in saves_text.split():
+        count = _count_token(token)
+        if count is not None:
+            return count
+    return 0
+
+
+def _card_to_result(card, index: int) -> ScanResult:
+    """Turn the card data returned by the Savee driver into a ScanResult."""
+    # If no card is found (e.g., index out of range), handle as a failure.
+    if not card:
+        error_msg = f"No card found at index {index}"
+        logger.error(error_msg)
+        return ScanResult(False, index + 1, error=error_msg)
+
+    # parse_savee_profile always returns its full result dict (image_url,
+    # saves, error, ...) with the values already extracted in the browser,
+    # so the keys are read directly; a contract change belongs in the driver
+    error = card['error']
+    if error:
+        logger.warning("Savee driver reported an error at index %s: %s", index, error)
+        return ScanResult(False, index + 1, error=error)
+    card_url = card['image_url']
+
+    # Step 4: Determine the number of saves (likes) for this card.
+    # The driver usually reports an int; labels ("1.2k Saves") are parsed.
+    saves_text = card['saves']
+    if isinstance(saves_text, int):
+        saves_count = saves_text
+    elif saves_text:
+        # Hand-written scan instead of a regex; also expands k/m suffixes
+        try:
+            saves_count = _parse_saves(saves_text)
+        except ValueError as e:
+            logger.warning(
+                "Failed to parse saves count from text '%s': %s", saves_text, e)
+            saves_count = 0
+    else:
+        logger.warning(
+            "No saves count found for card at index %s, defaulting to 0.", index)
+        saves_count = 0
+
+    logger.info("Card at index %s has %s saves", index, saves_count)
+
+    # Step 5: Check if the saves count meets the threshold (LIKES_THRESHOLD).
+    if saves_count >= LIKES_THRESHOLD:
+        if not card_url:
+            error_msg = f"No media URL for card at index {index}"
+            logger.error(error_msg)
+            return ScanResult(False, index + 1, error=error_msg)
+        logger.info(
+            "Card at index %s meets the threshold (>= %s saves). Marking as hit.",
+            index, LIKES_THRESHOLD)
+        return ScanResult(True, index + 1, MediaItem(index, card_url, saves_count))
+    else:
+        logger.info(
+            "Card at index %s does not meet the threshold (< %s saves).",
+            index, LIKES_THRESHOLD)
+        return ScanResult(False, index + 1)
+
 
 def process_one(driver, profile_url: str, index: int) -> ScanResult:
     """
     Process a single image or video card from a Savee profile by index.
-    Returns a ScanResult indicating whether the item meets the criteria (20+ saves) and related data.
+    Returns a ScanResult indicating whether the item meets the criteria (LIKES_THRESHOLD+ saves) and related data.
     """
     try:
-        # Step 1: Navigate to the profile page (if not already there) and scroll to the target card.
-        logger.info(f"Navigating to Savee profile: {profile_url}")
-        driver.get(profile_url)  # Navigate to the profile page
-        logger.info(f"Scrolling to card at index {index}")
+        # Step 1: Navigation and scrolling are left to parse_savee_profile: it
+        # opens the profile only when the browser is not on it already, so
+        # consecutive cards of one profile share a single page load.
+        logger.info("Scrolling to card at index %s of %s", index, profile_url)
 
         # Step 2: Extract the card data using the Savee profile parser.
         card = parse_savee_profile(driver, profile_url, index)
-        logger.debug(f"Extracted card data at index {index}: {card}")
-
-        # If no card is found (e.g., index out of range), handle as a failure.
-        if not card:
-            error_msg = f"No card found at index {index}"
-            logger.error(error_msg)
-            return ScanResult(hit=False, error=error_msg)
+        logger.debug("Extracted card data at index %s: %r", index, card)
 
-        # Build card_url for result usage
-        card_url = card.get('url') if isinstance(card, dict) else None
-        if not card_url:
-            # If card is not a dict or has no URL, try to retrieve from element (if card is a WebElement)
-            try:
-                card_url = card.get_attribute('href')
-            except Exception as e:
-                card_url = None
-
-        # Step 4: Determine the number of saves (likes) for this card.
-        # Parse the saves count from the card data.
-        saves_text = None
-        saves_count = 0
-        if isinstance(card, dict):
-            saves_text = card.get('saves')
-        else:
-            # If card is a WebElement, find the element containing the saves count text
-            try:
-                saves_element = card.find_element(
-                    By.XPATH, ".//*[contains(text(), 'Save')]")
-                saves_text = saves_element.text
-            except Exception as e:
-                saves_text = None
-        if saves_text:
-            # Extract numeric part and convert to int
-            try:
-                # Remove any commas and non-digit characters, then convert to int
-                match = re.search(r'\d+', saves_text.replace(',', ''))
-                if match:
-                    saves_count = int(match.group())
-            except Exception as e:
-                logger.warning(
-                    f"Failed to parse saves count from text '{saves_text}': {e}")
-                saves_count = 0
-        else:
-            logger.warning(
-                f"No saves count found for card at index {index}, defaulting to 0.")
-            saves_count = 0
+        return _card_to_result(card, index)
 
-        logger.info(f"Card at index {index} has {saves_count} saves")
+    except Exception as e:
+        # Log the exception with traceback and return a ScanResult indicating failure.
+        logger.error(
+            "Error processing Savee profile %s at index %s: %s", profile_url, index, e,
+            exc_info=True)
+        return ScanResult(False, index + 1, error=str(e))
 
-        # Step 5: Check if the saves count meets the threshold (20 or more).
-        if saves_count >= 20:
-            logger.info(
-                f"Card at index {index} meets the threshold (>= 20 saves). Marking as hit.")
-            return ScanResult(hit=True, url=card_url, error=None)
-        else:
-            logger.info(
-                f"Card at index {index} does not meet the threshold (< 20 saves).")
-            return ScanResult(hit=False, error=None)
 
+def process_many(driver, profile_url: str, indices: list[int]) -> list[ScanResult]:
+    """
+    Process several cards of one Savee profile, one ScanResult per index.
+    The profile is opened and scrolled once (to the largest index) and the
+    media are collected in a single pass, instead of once per card.
+    """
+    try:
+        cards = parse_savee_profile_batch(driver, profile_url, indices)
     except Exception as e:
-        # Log the exception with traceback and return a ScanResult indicating failure.
         logger.error(
-            f"Error processing Savee profile {profile_url} at index {index}: {e}", exc_info=True)
-        return ScanResult(hit=False, error=str(e))
+            "Error processing Savee profile %s at indices %s: %s", profile_url, indices, e,
+            exc_info=True)
+        return [ScanResult(False, index + 1, error=str(e)) for index in indices]
+
+    results = []
+    for index, card in zip(indices, cards):
+        try:
+            results.append(_card_to_result(card, index))
+        except Exception as e:
+            logger.error(
+                "Error processing Savee profile %s at index %s: %s", profile_url, index, e,
+                exc_info=True)
+            results.append(ScanResult(False, index + 1, error=str(e)))
+    return results